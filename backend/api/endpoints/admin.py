@@ -24,7 +24,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
         400: {"model": ErrorResponse, "description": "Помилка отримання статистики"}
     }
 )
-async def get_admin_stats(
+def get_admin_stats(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ) -> AdminStatsResponse:
@@ -42,7 +42,7 @@ async def get_admin_stats(
         400: {"model": ErrorResponse, "description": "Помилка отримання користувачів"}
     }
 )
-async def get_all_users_admin(
+def get_all_users_admin(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ) -> List[UserResponse]:
@@ -62,7 +62,7 @@ async def get_all_users_admin(
         422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
     }
 )
-async def create_user_admin(
+def create_user_admin(
         user_data: UserCreate,
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
@@ -99,7 +99,7 @@ async def create_user_admin(
         422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
     }
 )
-async def update_user_admin(
+def update_user_admin(
         user_id: str,
         user_data: UserUpdateRequest,
         current_user: Annotated[dict, Depends(require_admin_role)],
@@ -126,7 +126,7 @@ async def update_user_admin(
         404: {"model": ErrorResponse, "description": "Користувач не знайдений"}
     }
 )
-async def delete_user_admin(
+def delete_user_admin(
         user_id: str,
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
@@ -148,7 +148,7 @@ async def delete_user_admin(
         400: {"model": ErrorResponse, "description": "Помилка отримання налаштувань"}
     }
 )
-async def get_cvat_settings(
+def get_cvat_settings(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ) -> List[CVATSettings]:
@@ -166,7 +166,7 @@ async def get_cvat_settings(
         422: {"model": ErrorResponse, "description": "Project name in URL and body must match"}
     }
 )
-async def update_cvat_settings(
+def update_cvat_settings(
         project_name: str,
         settings_data: CVATSettings,
         current_user: Annotated[dict, Depends(require_admin_role)],
@@ -190,7 +190,7 @@ async def update_cvat_settings(
         400: {"model": ErrorResponse, "description": "Помилка скидання налаштувань"}
     }
 )
-async def reset_cvat_settings(
+def reset_cvat_settings(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ):
@@ -209,7 +209,7 @@ async def reset_cvat_settings(
         400: {"model": ErrorResponse, "description": "Помилка виправлення відео"}
     }
 )
-async def fix_orphaned_videos(
+def fix_orphaned_videos(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ):
@@ -229,7 +229,7 @@ async def fix_orphaned_videos(
         400: {"model": ErrorResponse, "description": "Помилка видалення відео"}
     }
 )
-async def delete_video(
+def delete_video(
         video_id: str,
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
@@ -249,7 +249,7 @@ async def delete_video(
         400: {"model": ErrorResponse, "description": "Помилка отримання списку відео"}
     }
 )
-async def get_admin_videos(
+def get_admin_videos(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)],
         page: int = Query(1, ge=1, description="Номер сторінки"),
@@ -268,7 +268,7 @@ async def get_admin_videos(
         400: {"model": ErrorResponse, "description": "Помилка отримання інформації про систему"}
     }
 )
-async def get_system_health(
+def get_system_health(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ):
@@ -285,7 +285,7 @@ async def get_system_health(
         400: {"model": ErrorResponse, "description": "Помилка очищення блокувань"}
     }
 )
-async def cleanup_video_locks(
+def cleanup_video_locks(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ):
@@ -302,7 +302,7 @@ async def cleanup_video_locks(
         400: {"model": ErrorResponse, "description": "Помилка примусового очищення"}
     }
 )
-async def force_cleanup_all_locks(
+def force_cleanup_all_locks(
         current_user: Annotated[dict, Depends(require_admin_role)],
         admin_service: Annotated[AdminService, Depends(AdminService)]
 ):
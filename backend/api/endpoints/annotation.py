@@ -24,7 +24,7 @@ router = APIRouter(tags=["annotation"])
         422: {"model": ErrorResponse, "description": "Невалідні параметри Azure path"}
     }
 )
-async def get_annotation(
+def get_annotation(
     _current_user: Annotated[dict, Depends(get_current_user)],
     azure_path: Annotated[AzureFilePath, Depends(get_azure_path_from_query)]
 ) -> GetAnnotationResponse:
@@ -50,14 +50,14 @@ async def get_annotation(
         422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
     }
 )
-async def save_fragments(
+def save_fragments(
     data: SaveFragmentsRequest,
     _current_user: Annotated[dict, Depends(get_current_user)]
 ) -> SaveFragmentsResponse:
     """Зберегти фрагменти відео та метадані"""
     annotation_service = AnnotationService()
 
-    result = await annotation_service.save_fragments_and_metadata(
+    result = annotation_service.save_fragments_and_metadata(
         data.azure_file_path, data.data
     )
 
@@ -83,14 +83,14 @@ async def save_fragments(
         422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
     }
 )
-async def save_annotation(
+def save_annotation(
     data: SaveAnnotationRequest,
     _current_user: Annotated[dict, Depends(get_current_user)]
 ) -> SaveAnnotationResponse:
     """Зберегти анотацію без обробки"""
     annotation_service = AnnotationService()
 
-    result = await annotation_service.save_annotation_only(
+    result = annotation_service.save_annotation_only(
         data.azure_file_path, data.data
     )
 
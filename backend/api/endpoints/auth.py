@@ -20,7 +20,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
         422: {"model": ErrorResponse, "description": "Невалідні дані запиту"}
     }
 )
-async def login(
+def login(
         login_data: LoginRequest,
         auth_service: Annotated[AuthService, Depends(AuthService)]
 ) -> Token:
@@ -45,7 +45,7 @@ async def login(
         422: {"model": ErrorResponse, "description": "Невалідний формат токена"}
     }
 )
-async def refresh_token(
+def refresh_token(
         refresh_data: RefreshTokenRequest,
         auth_service: Annotated[AuthService, Depends(AuthService)]
 ) -> Token:
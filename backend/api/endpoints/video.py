@@ -1,20 +1,62 @@
-from typing import Annotated, Dict
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import FileResponse
+import time
+from typing import Annotated, Dict, Literal
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse, Response
+from starlette.concurrency import run_in_threadpool
 
 from backend.models.api import (
     VideoUploadRequest, VideoUploadResponse, VideoStatusResponse,
-    VideoListResponse, LockVideoResponse, ErrorResponse
+    VideoListResponse, LockVideoResponse, ErrorResponse,
+    TaskProgressSubscriptionRequest, TaskProgressSubscriptionResponse, CurrentUser,
+    ThumbnailsIndexResponse, KeyframeIndexResponse
 )
 from backend.services.video_service import VideoService
+from backend.services.task_progress_service import TaskProgressService
 from backend.services.auth_service import AuthService
 from backend.api.dependencies import get_current_user, get_azure_path_from_query, get_pagination_params
 
 from backend.models.shared import AzureFilePath
+from backend.config.settings import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/video", tags=["video"])
 
 
+def _authenticate_query_token(token: str) -> CurrentUser:
+    """Перевірка токена з query параметра для медіа-запитів, які не передають заголовки"""
+    auth_service = AuthService()
+    current_user = auth_service.get_current_user_from_token(token)
+
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Невалідний або прострочений токен")
+
+    # Перевіряємо права доступу (annotator, admin, super_admin)
+    if current_user.role not in ["annotator", "admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Недостатньо прав для перегляду відео")
+
+    return current_user
+
+
+def _derived_file_response(request: Request, file_info: Dict, media_type: str) -> Response:
+    """Віддача незмінного похідного файлу (спрайт прев'ю) через nginx з валідаторами кешу"""
+    headers = {
+        "Cache-Control": "private, max-age=86400, immutable",
+        **file_info["validators"]
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    if settings.stream_via_nginx:
+        headers["X-Accel-Redirect"] = settings.nginx_source_videos_location + quote(file_info["relative_path"])
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(path=file_info["file_path"], media_type=media_type, headers=headers)
+
+
 @router.post(
     "/upload",
     response_model=VideoUploadResponse,
@@ -25,7 +67,7 @@ router = APIRouter(prefix="/video", tags=["video"])
         422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
     }
 )
-async def upload_video(
+def upload_video(
         data: VideoUploadRequest,
         _current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)]
@@ -49,7 +91,7 @@ async def upload_video(
         400: {"model": ErrorResponse, "description": "Помилка отримання статусу завдання"}
     }
 )
-async def get_task_status(
+def get_task_status(
         task_id: str,
         _current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)]
@@ -58,6 +100,58 @@ async def get_task_status(
     return video_service.get_task_status(task_id)
 
 
+@router.post(
+    "/task/progress/subscriptions",
+    response_model=TaskProgressSubscriptionResponse,
+    summary="Підписка на прогрес завдань",
+    description="Зберігає набір task_id для SSE потоку прогресу, щоб не передавати їх у URL",
+    responses={
+        422: {"model": ErrorResponse, "description": "Помилка валідації даних"}
+    }
+)
+def create_task_progress_subscription(
+        data: TaskProgressSubscriptionRequest,
+        _current_user: Annotated[dict, Depends(get_current_user)],
+        progress_service: Annotated[TaskProgressService, Depends(TaskProgressService)]
+) -> TaskProgressSubscriptionResponse:
+    """Створення підписки на прогрес завдань"""
+    subscription_id = progress_service.create_subscription(data.task_ids)
+    return TaskProgressSubscriptionResponse(subscription_id=subscription_id)
+
+
+@router.get(
+    "/task/progress/stream",
+    summary="SSE потік прогресу завдань",
+    description="Server-sent events з прогресом завантаження та конвертації для всіх завдань підписки",
+    responses={
+        401: {"model": ErrorResponse, "description": "Невалідний токен"},
+        404: {"model": ErrorResponse, "description": "Підписку не знайдено"}
+    }
+)
+async def stream_task_progress(
+        request: Request,
+        subscription_id: str = Query(..., description="ID підписки на прогрес"),
+        token: str = Query(..., description="Authorization token")
+) -> StreamingResponse:
+    """SSE потік прогресу замість періодичного опитування статусу"""
+    # EventSource не передає заголовки - перевіряємо токен вручну
+    await run_in_threadpool(_authenticate_query_token, token)
+
+    progress_service = TaskProgressService()
+    task_ids = await run_in_threadpool(progress_service.get_subscription, subscription_id)
+    if not task_ids:
+        raise HTTPException(status_code=404, detail="Підписку не знайдено або вона застаріла")
+
+    return StreamingResponse(
+        progress_service.stream(task_ids, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get(
     "/status",
     response_model=VideoStatusResponse,
@@ -68,7 +162,7 @@ async def get_task_status(
         422: {"model": ErrorResponse, "description": "Невалідні параметри Azure path"}
     }
 )
-async def get_video_status(
+def get_video_status(
         _current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)],
         azure_path: Annotated[AzureFilePath, Depends(get_azure_path_from_query)]
@@ -86,7 +180,7 @@ async def get_video_status(
         400: {"model": ErrorResponse, "description": "Помилка отримання списку відео"}
     }
 )
-async def get_videos_list(
+def get_videos_list(
         current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)],
         pagination: Annotated[Dict[str, int], Depends(get_pagination_params)]
@@ -110,7 +204,7 @@ async def get_videos_list(
         400: {"model": ErrorResponse, "description": "Відео не готове для анотації"}
     }
 )
-async def lock_video(
+def lock_video(
         video_id: str,
         current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)]
@@ -123,6 +217,27 @@ async def lock_video(
     )
 
 
+@router.post(
+    "/{video_id}/heartbeat",
+    response_model=LockVideoResponse,
+    summary="Продовжити блокування відео",
+    description="Продовжує коротку оренду блокування відео. Редактор викликає періодично, поки користувач працює з відео",
+    responses={
+        409: {"model": ErrorResponse, "description": "Блокування втрачено або належить іншому користувачу"}
+    }
+)
+def heartbeat_video_lock(
+        video_id: str,
+        current_user: Annotated[dict, Depends(get_current_user)],
+        video_service: Annotated[VideoService, Depends(VideoService)]
+) -> LockVideoResponse:
+    """Продовження блокування відео"""
+    return video_service.extend_video_lock(
+        video_id=video_id,
+        user_id=current_user["user_id"]
+    )
+
+
 @router.post(
     "/{video_id}/unlock",
     summary="Розблокувати відео",
@@ -131,7 +246,7 @@ async def lock_video(
         400: {"model": ErrorResponse, "description": "Не можна розблокувати відео іншого користувача"}
     }
 )
-async def unlock_video(
+def unlock_video(
         video_id: str,
         current_user: Annotated[dict, Depends(get_current_user)],
         video_service: Annotated[VideoService, Depends(VideoService)]
@@ -153,35 +268,154 @@ async def unlock_video(
         403: {"model": ErrorResponse, "description": "Недостатньо прав для перегляду"}
     }
 )
-async def stream_video_by_id(
+def stream_video_by_id(
         video_id: str,
+        request: Request,
         video_service: Annotated[VideoService, Depends(VideoService)],
-        token: str = Query(..., description="Authorization token")
-) -> FileResponse:
+        token: str = Query(..., description="Authorization token"),
+        quality: Literal["proxy", "original"] = Query("proxy", description="proxy - легка копія, original - повна якість")
+) -> Response:
     """Безпечний стрімінг локального відео за video_id"""
-    # Перевіряємо токен вручну
-    auth_service = AuthService()
-    current_user = auth_service.get_current_user_from_token(token)
-    
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Невалідний або прострочений токен")
-    
-    # Перевіряємо права доступу (annotator, admin, super_admin)
-    if current_user.role not in ["annotator", "admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Недостатньо прав для перегляду відео")
-    
-    file_info = video_service.get_video_file_for_streaming_by_id(video_id, current_user.user_id)
+    current_user = _authenticate_query_token(token)
+
+    file_info = video_service.get_video_file_for_streaming_by_id(video_id, current_user.user_id, quality)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600",
+        **file_info["validators"]
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    if settings.stream_via_nginx:
+        # Передаємо саму віддачу nginx (sendfile + Range), воркер лише перевіряє доступ
+        headers["X-Accel-Redirect"] = settings.nginx_source_videos_location + quote(file_info["filename"])
+        return Response(media_type="video/mp4", headers=headers)
 
     return FileResponse(
         path=file_info["file_path"],
         media_type="video/mp4",
         filename=file_info["filename"],
-        headers={
-            "Accept-Ranges": "bytes",
-            "Cache-Control": "public, max-age=3600",
-            "Content-Type": "video/mp4"
-        }
+        headers=headers
     )
 
 
+@router.get(
+    "/{video_id}/hls/playlist.m3u8",
+    summary="HLS плейлист відео",
+    description="Плейлист коротких fMP4 сегментів для редактора. Посилання на сегменти підписані без токена користувача",
+    responses={
+        404: {"model": ErrorResponse, "description": "Відео або HLS плейлист не знайдено"},
+        403: {"model": ErrorResponse, "description": "Недостатньо прав для перегляду"}
+    }
+)
+def get_hls_playlist(
+        video_id: str,
+        video_service: Annotated[VideoService, Depends(VideoService)],
+        token: str = Query(..., description="Authorization token")
+) -> Response:
+    """HLS плейлист з перевіркою доступу та блокування"""
+    current_user = _authenticate_query_token(token)
+    playlist = video_service.get_hls_playlist(video_id, current_user.user_id)
+
+    return Response(
+        content=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get(
+    "/{video_id}/hls/{expires}/{signature}/{media_name}",
+    summary="HLS сегмент відео",
+    description="Init-сегмент або fMP4 сегмент HLS за підписаним посиланням з плейлиста. "
+                "Посилання однакові для всіх користувачів, тому сегменти кешуються nginx і браузером",
+    responses={
+        401: {"model": ErrorResponse, "description": "Підпис невалідний або прострочений"},
+        404: {"model": ErrorResponse, "description": "Сегмент не знайдено"}
+    }
+)
+def get_hls_media(
+        video_id: str,
+        expires: int,
+        signature: str,
+        media_name: str,
+        request: Request,
+        video_service: Annotated[VideoService, Depends(VideoService)]
+) -> Response:
+    """Віддача HLS сегмента у спільний кеш nginx на час дії підпису"""
+    file_info = video_service.get_hls_media_file(video_id, expires, signature, media_name)
+
+    # Без X-Accel-Redirect: nginx кешує лише відповіді з тілом, сегменти малі
+    max_age = max(expires - int(time.time()), 0)
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, immutable",
+        **file_info["validators"]
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path=file_info["file_path"], media_type="video/mp4", headers=headers)
+
 
+@router.get(
+    "/{video_id}/thumbnails",
+    response_model=ThumbnailsIndexResponse,
+    summary="Індекс прев'ю таймлайна",
+    description="Параметри спрайтів прев'ю: інтервал між кадрами, розмір мініатюри, сітка та список спрайтів",
+    responses={
+        404: {"model": ErrorResponse, "description": "Прев'ю ще не згенеровано"}
+    }
+)
+def get_thumbnails_index(
+        video_id: str,
+        current_user: Annotated[dict, Depends(get_current_user)],
+        video_service: Annotated[VideoService, Depends(VideoService)]
+) -> ThumbnailsIndexResponse:
+    """Індекс спрайтів прев'ю для таймлайна редактора"""
+    index = video_service.get_thumbnails_index(video_id, current_user["user_id"])
+    return ThumbnailsIndexResponse(**index)
+
+
+@router.get(
+    "/{video_id}/keyframes",
+    response_model=KeyframeIndexResponse,
+    summary="Індекс ключових кадрів",
+    description="Час ключових кадрів оригіналу у мілісекундах, закодований дельтами. "
+                "Кліпи нарізаються без перекодування, тому починаються з ключового кадру",
+    responses={
+        404: {"model": ErrorResponse, "description": "Відео або локальний файл не знайдено"}
+    }
+)
+def get_keyframe_index(
+        video_id: str,
+        current_user: Annotated[dict, Depends(get_current_user)],
+        video_service: Annotated[VideoService, Depends(VideoService)]
+) -> KeyframeIndexResponse:
+    """Індекс ключових кадрів для прив'язки міток у редакторі"""
+    return KeyframeIndexResponse(**video_service.get_keyframe_index(video_id, current_user["user_id"]))
+
+
+@router.get(
+    "/{video_id}/thumbnails/{file_name}",
+    summary="Спрайт прев'ю таймлайна",
+    description="JPEG спрайт з мініатюрами або WebVTT індекс. Файли незмінні, тому кешуються браузером",
+    responses={
+        404: {"model": ErrorResponse, "description": "Файл прев'ю не знайдено"}
+    }
+)
+def get_thumbnail_file(
+        video_id: str,
+        file_name: str,
+        request: Request,
+        video_service: Annotated[VideoService, Depends(VideoService)],
+        token: str = Query(..., description="Authorization token")
+) -> Response:
+    """Віддача спрайта прев'ю через nginx"""
+    _authenticate_query_token(token)
+    file_info = video_service.get_thumbnail_file(video_id, file_name)
+    media_type = "text/vtt" if file_name.endswith(".vtt") else "image/jpeg"
+    return _derived_file_response(request, file_info, media_type)
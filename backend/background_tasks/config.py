@@ -22,9 +22,13 @@ task_time_limit = 7200
 
 task_routes = {
     'download_and_convert_video': {'queue': 'video_conversion'},
+    'package_video_hls': {'queue': 'video_conversion'},
+    'generate_thumbnail_sprites': {'queue': 'video_conversion'},
     'process_video_annotation': {'queue': 'video_processing'},
     'process_video_clip': {'queue': 'clip_processing'},
+    'cut_video_clip_group': {'queue': 'clip_processing'},
     'finalize_video_processing': {'queue': 'video_processing'},
+    'fail_video_processing': {'queue': 'video_processing'},
     'periodic_system_cleanup': {'queue': 'maintenance'},
 }
 
@@ -1,10 +1,14 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from celery import chain, chord, group
 
 from backend.background_tasks.app import app
 from backend.services.clip_processing_service import ClipProcessingService
+from backend.config.settings import get_settings
 from backend.utils.logger import get_logger
 from backend.database.connection import DatabaseConnection
 
+settings = get_settings()
 logger = get_logger(__name__, "tasks.log")
 
 
@@ -19,20 +23,105 @@ def process_video_clip(self, clip_video_id: str) -> Dict[str, Any]:
         service = ClipProcessingService()
         return service.process_single_clip(clip_video_id)
     except Exception as e:
+        # Помилка зупиняє ланцюжок, і errback chord-а позначає відео як невдале
         logger.error(f"Error processing clip {clip_video_id}: {str(e)}")
+        raise
+
+
+@app.task(name="cut_video_clip_group", bind=True)
+def cut_video_clip_group(self, clip_video_ids: List[str]) -> Dict[str, Any]:
+    """Cut a group of neighbouring clips in one pass right before their clip tasks"""
+    try:
+        # Ensure database connection
+        if not DatabaseConnection.is_connected():
+            DatabaseConnection.connect()
+
+        service = ClipProcessingService()
+        return service.cut_clip_group(clip_video_ids)
+    except Exception as e:
+        # Невдала пакетна нарізка не критична - кліпи наріжуться по одному
+        logger.error(f"Error cutting clip group {clip_video_ids}: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 
 @app.task(name="process_all_video_clips", bind=True)
 def process_all_video_clips(self, source_video_id: str) -> Dict[str, Any]:
-    """Process all clips for a source video"""
+    """Fan out clip processing for a source video and finalize it in a chord callback"""
     try:
         # Ensure database connection
         if not DatabaseConnection.is_connected():
             DatabaseConnection.connect()
 
         service = ClipProcessingService()
-        return service.process_all_clips_for_video(source_video_id)
+        clips = service.get_clips_for_video(source_video_id)
+
+        if not clips:
+            logger.warning(f"No clips found for source video: {source_video_id}")
+            service.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
+            return {"status": "error", "message": "Не знайдено кліпів для обробки"}
+
+        # Кліпи одного відео розкладаються на кілька послідовних ланцюжків, щоб обмежити
+        # одночасне навантаження на диск і CVAT; групу нарізає перша ланка перед її кліпами
+        lanes = service.plan_clip_lanes(clips, min(settings.clip_max_parallel_per_video, len(clips)))
+        lane_count = len(lanes)
+
+        header = group(chain(*_build_lane_signatures(lane)) for lane in lanes)
+        # Якщо ланцюжок впав або воркер загинув, callback не виконається - errback позначає відео як невдале
+        callback = finalize_video_processing.si(source_video_id).on_error(
+            fail_video_processing.s(source_video_id)
+        )
+        result = chord(header)(callback)
+
+        logger.info(f"Dispatched {len(clips)} clips in {lane_count} lanes for video {source_video_id}, "
+                    f"finalize task: {result.id}")
+
+        return {
+            "status": "processing",
+            "message": f"Почато обробку {len(clips)} кліпів",
+            "total_clips": len(clips),
+            "finalize_task_id": result.id
+        }
     except Exception as e:
         logger.error(f"Error processing clips for video {source_video_id}: {str(e)}")
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+
+def _build_lane_signatures(lane: List[List[Any]]) -> List[Any]:
+    """Batch cut of each group followed by the tasks of its clips"""
+    signatures = []
+    for clip_group in lane:
+        if len(clip_group) > 1:
+            signatures.append(cut_video_clip_group.si([str(clip.id) for clip in clip_group]))
+        signatures.extend(process_video_clip.si(str(clip.id)) for clip in clip_group)
+    return signatures
+
+
+@app.task(name="finalize_video_processing", bind=True)
+def finalize_video_processing(self, source_video_id: str) -> Dict[str, Any]:
+    """Finalize source video after all its clip tasks have finished"""
+    try:
+        # Ensure database connection
+        if not DatabaseConnection.is_connected():
+            DatabaseConnection.connect()
+
+        service = ClipProcessingService()
+        return service.finalize_clips_processing(source_video_id)
+    except Exception as e:
+        logger.error(f"Error finalizing clips for video {source_video_id}: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name="fail_video_processing")
+def fail_video_processing(request, exc, traceback, source_video_id: str) -> Dict[str, Any]:
+    """Chord error callback: mark source video failed when its clip chains did not finish"""
+    try:
+        # Ensure database connection
+        if not DatabaseConnection.is_connected():
+            DatabaseConnection.connect()
+
+        service = ClipProcessingService()
+        service.fail_clips_processing(source_video_id, str(exc))
+        return {"status": "error", "message": str(exc)}
+    except Exception as e:
+        logger.error(f"Error marking clips processing failed for video {source_video_id}: {str(e)}")
+        return {"status": "error", "message": str(e)}
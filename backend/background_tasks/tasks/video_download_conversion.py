@@ -4,6 +4,10 @@ from backend.background_tasks.app import app
 from backend.services.video_processing_service import VideoProcessingService
 from backend.models.shared import AzureFilePath
 from backend.utils.logger import get_logger
+from backend.utils.progress_events import publish_task_progress
+from backend.config.settings import get_settings
+
+settings = get_settings()
 
 logger = get_logger(__name__, "tasks.log")
 
@@ -15,39 +19,38 @@ def download_and_convert_video(self, azure_path_dict: Dict[str, str]) -> Dict[st
         service = VideoProcessingService()
         azure_path = AzureFilePath(**azure_path_dict)
 
+        def report_progress(progress: int, stage: str, message: str) -> None:
+            """Store progress in the result backend and push it to SSE subscribers"""
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'progress': progress,
+                    'stage': stage,
+                    'message': message
+                }
+            )
+            publish_task_progress(self.request.id, "processing", progress, stage, message)
+
         def update_download_progress(downloaded_bytes: int, total_bytes: int) -> None:
             """Update download progress (5-50%)"""
             if total_bytes > 0:
                 download_percent = 5 + (downloaded_bytes / total_bytes) * 45
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'progress': min(int(download_percent), 50),
-                        'stage': 'downloading',
-                        'message': f'Завантажено {downloaded_bytes // (1024 * 1024)} МБ з {total_bytes // (1024 * 1024)} МБ'
-                    }
+                report_progress(
+                    min(int(download_percent), 50),
+                    'downloading',
+                    f'Завантажено {downloaded_bytes // (1024 * 1024)} МБ з {total_bytes // (1024 * 1024)} МБ'
                 )
 
         def update_conversion_progress(progress_percent: float) -> None:
             """Update conversion progress (60-95%)"""
             conversion_progress = 60 + (progress_percent * 0.35)
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'progress': min(int(conversion_progress), 95),
-                    'stage': 'converting',
-                    'message': f'Конвертація: {progress_percent:.1f}%'
-                }
+            report_progress(
+                min(int(conversion_progress), 95),
+                'converting',
+                f'Конвертація: {progress_percent:.1f}%'
             )
 
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'progress': 5,
-                'stage': 'downloading',
-                'message': 'Початок завантаження з Azure Storage...'
-            }
-        )
+        report_progress(5, 'downloading', 'Початок завантаження з Azure Storage...')
 
         result = service.download_and_convert_video(
             azure_path=azure_path,
@@ -58,8 +61,50 @@ def download_and_convert_video(self, azure_path_dict: Dict[str, str]) -> Dict[st
         if result["status"] == "error":
             raise Exception(result["message"])
 
+        if settings.hls_packaging_enabled:
+            package_video_hls.delay(azure_path_dict)
+        if settings.thumbnail_sprites_enabled:
+            generate_thumbnail_sprites.delay(azure_path_dict)
+
+        publish_task_progress(self.request.id, "completed", 100, "completed", "Відео готове для анотації")
         return result
 
     except Exception as e:
         logger.error(f"Error in download_and_convert_video task: {str(e)}")
-        raise self.retry(exc=e, countdown=60)
\ No newline at end of file
+        if self.request.retries >= self.max_retries:
+            publish_task_progress(self.request.id, "failed", 0, "failed", str(e))
+        raise self.retry(exc=e, countdown=60)
+
+
+@app.task(name="package_video_hls", bind=True, max_retries=2)
+def package_video_hls(self, azure_path_dict: Dict[str, str]) -> Dict[str, Any]:
+    """Package a converted video as HLS; the editor falls back to progressive playback meanwhile"""
+    try:
+        service = VideoProcessingService()
+        result = service.package_hls(AzureFilePath(**azure_path_dict))
+
+        if result["status"] == "error":
+            raise Exception(result["message"])
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Error in package_video_hls task: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@app.task(name="generate_thumbnail_sprites", bind=True, max_retries=2)
+def generate_thumbnail_sprites(self, azure_path_dict: Dict[str, str]) -> Dict[str, Any]:
+    """Build timeline preview sprites; the editor simply shows no previews until they exist"""
+    try:
+        service = VideoProcessingService()
+        result = service.generate_thumbnail_sprites(AzureFilePath(**azure_path_dict))
+
+        if result["status"] == "error":
+            raise Exception(result["message"])
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Error in generate_thumbnail_sprites task: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
@@ -5,7 +5,6 @@ from typing import Dict, Any
 
 from backend.background_tasks.app import app
 from backend.background_tasks.tasks.clip_processing import process_all_video_clips
-from backend.services.clip_processing_service import ClipProcessingService
 from backend.services.video_service import VideoService
 from backend.utils.azure_path_utils import parse_azure_blob_url_to_path
 from backend.utils.logger import get_logger
@@ -35,23 +34,20 @@ def process_video_annotation(self, azure_link: str) -> Dict[str, Any]:
                 "message": f"Відео не готове для анотації: {video_status.status}"
             }
 
-        # Запускаємо обробку всіх кліпів через іншу задачу
-        clip_service = ClipProcessingService()
-        result = clip_service.process_all_clips_for_video(str(video_status.id))
+        # Розподіляємо кліпи по chord-у; підсумок відео робить його callback
+        result = process_all_video_clips(str(video_status.id))
 
         if result["status"] == "error":
             return result
 
-        # Запускаємо асинхронну задачу для обробки кліпів
-        task = process_all_video_clips.delay(str(video_status.id))
-
-        logger.info(f"Started clips processing for video: {azure_link}, task_id: {task.id}")
+        logger.info(f"Started clips processing for video: {azure_link}, "
+                    f"finalize task_id: {result['finalize_task_id']}")
 
         return {
             "status": "success",
-            "message": f"Почато обробку {result.get('total_clips', 0)} кліпів",
-            "task_id": task.id,
-            "total_clips": result.get('total_clips', 0),
+            "message": result["message"],
+            "task_id": result["finalize_task_id"],
+            "total_clips": result["total_clips"],
             "source_video_id": str(video_status.id)
         }
 
@@ -63,7 +59,7 @@ def process_video_annotation(self, azure_link: str) -> Dict[str, Any]:
 @app.task(name="cleanup_source_video_files")
 def cleanup_source_video_files(source_video_ids: list) -> Dict[str, Any]:
     """Clean up local source video files after processing"""
-    from backend.utils.video_utils import get_local_video_path, cleanup_file
+    from backend.utils.video_utils import get_local_video_path, cleanup_file, cleanup_derived_files
     from backend.database import create_source_video_repository
     from backend.utils.azure_path_utils import extract_filename_from_azure_path
     from backend.models.shared import AzureFilePath
@@ -98,6 +94,7 @@ def cleanup_source_video_files(source_video_ids: list) -> Dict[str, Any]:
                     cleanup_file(local_path)
                     logger.info(f"Cleaned up local file: {local_path}")
                     cleaned_files += 1
+                cleanup_derived_files(filename)
 
             except Exception as e:
                 logger.error(f"Error cleaning up source video {source_video_id}: {str(e)}")
@@ -41,6 +41,10 @@ class Settings(BaseSettings):
     cvat_port: int = Field(default=8080)
     cvat_username: str
     cvat_password: str
+    cvat_pool_size: int = Field(default=10)
+    cvat_request_timeout: int = Field(default=60)
+    cvat_upload_chunk_size: int = Field(default=8388608)  # 8MB
+    cvat_task_timeout: int = Field(default=300)  # Очікування обробки даних завдання
 
     # Paths - дефолти для структури проєкту
     temp_folder: str = Field(default="temp")
@@ -58,21 +62,61 @@ class Settings(BaseSettings):
     fast_api_host: str = Field(default="0.0.0.0")
     fast_api_port: int = Field(default=8000)
     reload: bool = Field(default=False)
+    api_threadpool_size: int = Field(default=40)  # Потоки для синхронних ендпоінтів
+
+    # Nginx - віддача відео через X-Accel-Redirect (вимкнути, якщо API працює без nginx)
+    stream_via_nginx: bool = Field(default=True)
+    nginx_source_videos_location: str = Field(default="/internal/source_videos/")
 
     # Azure processing - технічні дефолти
     azure_download_chunk_size: int = Field(default=16777216)  # 16MB
     azure_max_concurrency: int = Field(default=4)
+    azure_manifest_checkpoint_chunks: int = Field(default=16)  # Маніфест докачки зберігається раз на N частин
+    azure_manifest_checkpoint_sec: int = Field(default=5)  # ...або раз на N секунд
+    azure_validation_concurrency: int = Field(default=16)  # Паралельні перевірки URL при реєстрації
 
     # Video conversion - технічні дефолти
     video_conversion_preset: str = Field(default="fast")
     video_conversion_crf: int = Field(default=23)
     skip_conversion_for_compatible: bool = Field(default=True)
+    pipelined_conversion: bool = Field(default=True)  # Конвертація паралельно із завантаженням
+    segment_parallel_min_duration_sec: int = Field(default=1200)  # Довгі відео кодуються сегментами
+    segment_parallel_workers: int = Field(default=4)
+
+    # Proxy rendition - легка копія для редактора (кліпи нарізаються з оригіналу)
+    proxy_rendition_enabled: bool = Field(default=True)
+    proxy_rendition_height: int = Field(default=540)
+    proxy_rendition_crf: int = Field(default=28)
+    proxy_rendition_maxrate: str = Field(default="1500k")
+    proxy_rendition_keyframe_interval_sec: int = Field(default=1)  # Щільні ключові кадри для швидкої перемотки
+
+    # HLS - короткі fMP4 сегменти для редактора (пакування без перекодування)
+    hls_packaging_enabled: bool = Field(default=False)
+    hls_segment_duration_sec: int = Field(default=4)
+    hls_segment_url_ttl_sec: int = Field(default=21600)  # Вікно підпису URL сегментів, спільне для всіх користувачів
+
+    # Thumbnail sprites - прев'ю для таймлайна редактора
+    thumbnail_sprites_enabled: bool = Field(default=True)
+    thumbnail_interval_sec: int = Field(default=5)
+    thumbnail_max_count: int = Field(default=600)  # Для довгих відео інтервал збільшується
+    thumbnail_width: int = Field(default=160)
+    thumbnail_sprite_columns: int = Field(default=10)
+    thumbnail_sprite_rows: int = Field(default=10)
+
+    # Clip cutting - кліпи поруч у часі нарізаються одним проходом FFmpeg
+    clip_batch_max_gap_sec: int = Field(default=120)
+    clip_batch_max_outputs: int = Field(default=16)
+    clip_max_parallel_per_video: int = Field(default=3)  # Паралельні задачі кліпів одного відео
+
+    # Video locks - коротка оренда, яку редактор продовжує heartbeat-запитами
+    video_lock_lease_sec: int = Field(default=300)
 
     # JWT - обов'язковий secret_key
     secret_key: str = Field(alias="SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256")
     access_token_expire_minutes: int = Field(default=30)
     refresh_token_expire_minutes: int = Field(default=10080)  # 7 days
+    auth_user_cache_ttl_sec: int = Field(default=30)  # Кеш перевірки активності користувача
 
     # Super Admins - обов'язкові
     super_admin_email_1: Optional[str] = Field(default=None)
@@ -91,7 +135,10 @@ class Settings(BaseSettings):
             return v
         return v.lower() in ("true", "1", "yes")
 
-    @field_validator("skip_conversion_for_compatible", mode="before")
+    @field_validator(
+        "skip_conversion_for_compatible", "pipelined_conversion", "stream_via_nginx",
+        "proxy_rendition_enabled", "hls_packaging_enabled", "thumbnail_sprites_enabled", mode="before"
+    )
     @classmethod
     def parse_bool_fields(cls, v: str | bool) -> bool:
         """Парсинг булевих полів"""
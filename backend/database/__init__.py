@@ -1,4 +1,4 @@
-from backend.database.document_repository import BaseDocumentRepository
+from backend.database.document_repository import BaseDocumentRepository, UpdateResult
 from backend.models.documents import (
     SourceVideoDocument, ClipVideoDocument,
     UserDocument, CVATProjectSettingsDocument,
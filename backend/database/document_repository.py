@@ -1,11 +1,29 @@
-from typing import TypeVar, Generic, List, Optional, Dict, Any, Type
-from mongoengine import Document, NotUniqueError
+from datetime import datetime, UTC
+from typing import TypeVar, Generic, List, Optional, Dict, Any, Type, Union, Tuple
+from mongoengine import Document, NotUniqueError, ValidationError
+from mongoengine.fields import EmbeddedDocumentField
 from backend.utils.logger import get_logger
 
 T = TypeVar('T', bound=Document)
 logger = get_logger(__name__, "repository.log")
 
 
+class UpdateResult:
+    """Result of an atomic update; truthy when a document matched the filter"""
+
+    __slots__ = ("matched_count", "modified_count")
+
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+    def __bool__(self) -> bool:
+        return self.matched_count > 0
+
+    def __repr__(self) -> str:
+        return f"UpdateResult(matched_count={self.matched_count}, modified_count={self.modified_count})"
+
+
 class BaseDocumentRepository(Generic[T]):
     """Base repository for MongoEngine documents"""
 
@@ -27,6 +45,29 @@ class BaseDocumentRepository(Generic[T]):
             logger.error(f"Error creating document in {self.collection_name}: {str(e)}")
             raise
 
+    def bulk_create(self, documents_data: List[Dict[str, Any]]) -> List[T]:
+        """Validate all documents up front, then insert them in a single round trip"""
+        if not documents_data:
+            return []
+
+        try:
+            documents = [self.document_class(**data) for data in documents_data]
+            for document in documents:
+                document.validate()
+
+            inserted_ids = self.document_class.objects.insert(documents, load_bulk=False)
+            for document, inserted_id in zip(documents, inserted_ids):
+                document.id = inserted_id
+
+            logger.debug(f"Bulk created {len(documents)} documents in {self.collection_name}")
+            return documents
+        except NotUniqueError as e:
+            logger.error(f"Unique constraint violation in {self.collection_name}: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error bulk creating documents in {self.collection_name}: {str(e)}")
+            raise
+
     def get_by_id(self, doc_id: str) -> Optional[T]:
         """Get document by ID"""
         try:
@@ -66,40 +107,129 @@ class BaseDocumentRepository(Generic[T]):
             logger.error(f"Error getting documents from {self.collection_name}: {str(e)}")
             raise
 
-    def update_by_id(self, doc_id: str, update_data: Dict[str, Any]) -> bool:
-        """Update document by ID"""
+    def get_page(self, filter_dict: Optional[Dict[str, Any]] = None, order_by: Optional[List[str]] = None,
+                 page: int = 1, per_page: int = 20) -> Tuple[List[T], int]:
+        """Get one page of documents and total count, filtered, sorted and sliced in the database"""
         try:
-            document = self.get_by_id(doc_id)
-            if not document:
-                return False
+            mongo_filter = {}
+            for key, value in (filter_dict or {}).items():
+                mongo_key = key.replace('.', '__')
+                mongo_filter[mongo_key] = value
+            query = self.document_class.objects(**mongo_filter)
 
-            for key, value in update_data.items():
-                setattr(document, key, value)
+            total_count = query.count()
+            if order_by:
+                query = query.order_by(*order_by)
 
-            document.save()
-            logger.debug(f"Updated document in {self.collection_name}: {doc_id}")
-            return True
+            offset = max(page - 1, 0) * per_page
+            return list(query.skip(offset).limit(per_page)), total_count
         except Exception as e:
-            logger.error(f"Error updating document {doc_id}: {str(e)}")
+            logger.error(f"Error getting page {page} from {self.collection_name}: {str(e)}")
             raise
 
-    def update_by_field(self, field: str, value: Any, update_data: Dict[str, Any]) -> bool:
-        """Update document by field"""
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run aggregation pipeline on the collection"""
         try:
-            document = self.get_by_field(field, value)
-            if not document:
-                return False
+            return list(self.document_class.objects.aggregate(pipeline))
+        except Exception as e:
+            logger.error(f"Error running aggregation on {self.collection_name}: {str(e)}")
+            raise
 
-            for key, update_value in update_data.items():
-                setattr(document, key, update_value)
+    def update_by_id(self, doc_id: str, update_data: Dict[str, Any],
+                     expected_status: Optional[Union[Any, List[Any]]] = None) -> UpdateResult:
+        """Atomically update document by ID, optionally only if it is in the expected status"""
+        try:
+            result = self._atomic_update({"id": doc_id}, update_data, expected_status)
+            logger.debug(f"Updated document in {self.collection_name}: {doc_id} "
+                         f"(matched={result.matched_count}, modified={result.modified_count})")
+            return result
+        except Exception as e:
+            logger.error(f"Error updating document {doc_id}: {str(e)}")
+            raise
 
-            document.save()
-            logger.debug(f"Updated document in {self.collection_name} by {field}={value}")
-            return True
+    def update_by_field(self, field: str, value: Any, update_data: Dict[str, Any],
+                        expected_status: Optional[Union[Any, List[Any]]] = None) -> UpdateResult:
+        """Atomically update first document matching field, optionally only if it is in the expected status"""
+        try:
+            result = self._atomic_update({field.replace('.', '__'): value}, update_data, expected_status)
+            logger.debug(f"Updated document in {self.collection_name} by {field}={value} "
+                         f"(matched={result.matched_count}, modified={result.modified_count})")
+            return result
         except Exception as e:
             logger.error(f"Error updating document by {field}={value}: {str(e)}")
             raise
 
+    def update_many(self, filter_dict: Dict[str, Any], update_data: Dict[str, Any]) -> UpdateResult:
+        """Atomically apply the same $set to all documents matching filter"""
+        try:
+            mongo_filter = {}
+            for key, value in filter_dict.items():
+                mongo_key = key.replace('.', '__')
+                mongo_filter[mongo_key] = value
+
+            set_kwargs = self._build_set_kwargs(update_data)
+
+            result = self.document_class.objects(**mongo_filter).update(full_result=True, **set_kwargs)
+            logger.debug(f"Updated {result.modified_count} documents in {self.collection_name}")
+            return UpdateResult(result.matched_count, result.modified_count)
+        except Exception as e:
+            logger.error(f"Error updating documents in {self.collection_name}: {str(e)}")
+            raise
+
+    def _atomic_update(self, query: Dict[str, Any], update_data: Dict[str, Any],
+                       expected_status: Optional[Union[Any, List[Any]]]) -> UpdateResult:
+        """Single server-side update_one with $set and auto-maintained updated_at_utc"""
+        if expected_status is not None:
+            if isinstance(expected_status, (list, tuple, set)):
+                query["status__in"] = list(expected_status)
+            else:
+                query["status"] = expected_status
+
+        set_kwargs = self._build_set_kwargs(update_data)
+
+        if not set_kwargs:
+            matched = 1 if self.document_class.objects(**query).first() is not None else 0
+            return UpdateResult(matched, 0)
+
+        result = self.document_class.objects(**query).update_one(full_result=True, **set_kwargs)
+        return UpdateResult(result.matched_count, result.modified_count)
+
+    def _build_set_kwargs(self, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert update dict to MongoEngine set__ kwargs, refreshing updated_at_utc when the document has it"""
+        for key, value in update_data.items():
+            self._validate_update_value(key, value)
+
+        set_kwargs = {f"set__{key.replace('.', '__')}": value for key, value in update_data.items()}
+        if "updated_at_utc" in self.document_class._fields and "updated_at_utc" not in update_data:
+            set_kwargs["set__updated_at_utc"] = datetime.now(UTC)
+        return set_kwargs
+
+    def _validate_update_value(self, key: str, value: Any) -> None:
+        """Run field validation for a $set value, since server-side updates bypass Document.validate"""
+        fields = self.document_class._fields
+        parts = key.split('.')
+        for depth, part in enumerate(parts):
+            field = fields.get(part)
+            if field is None:
+                raise ValidationError(f"Unknown field '{key}' in {self.collection_name} update")
+            if depth == len(parts) - 1:
+                break
+            # Вкладені ключі DictField/ListField схеми не мають - перевіряти нічого
+            if not isinstance(field, EmbeddedDocumentField):
+                return
+            fields = field.document_type._fields
+
+        if value is None:
+            if field.required:
+                raise ValidationError(f"Field '{key}' is required", field_name=key)
+            return
+
+        try:
+            field._validate(value)
+        except ValidationError as e:
+            raise ValidationError(f"Invalid value for '{key}' in {self.collection_name} update: {e.message}",
+                                  field_name=key)
+
     def delete_by_id(self, doc_id: str) -> bool:
         """Delete document by ID"""
         try:
@@ -114,6 +244,23 @@ class BaseDocumentRepository(Generic[T]):
             logger.error(f"Error deleting document {doc_id}: {str(e)}")
             raise
 
+    def delete_many(self, filter_dict: Dict[str, Any]) -> int:
+        """Delete all documents matching filter in a single round trip"""
+        if not filter_dict:
+            raise ValueError("delete_many requires a non-empty filter")
+
+        try:
+            mongo_filter = {}
+            for key, value in filter_dict.items():
+                mongo_key = key.replace('.', '__')
+                mongo_filter[mongo_key] = value
+            deleted_count = self.document_class.objects(**mongo_filter).delete()
+            logger.info(f"Deleted {deleted_count} documents from {self.collection_name} by {filter_dict}")
+            return deleted_count
+        except Exception as e:
+            logger.error(f"Error deleting documents from {self.collection_name}: {str(e)}")
+            raise
+
     def count(self, filter_dict: Optional[Dict[str, Any]] = None) -> int:
         """Count documents"""
         try:
@@ -1,5 +1,6 @@
 import os
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
@@ -26,6 +27,9 @@ async def lifespan(_app: FastAPI):
     logger.info("🚀 Запуск додатка...")
 
     try:
+        # Синхронні ендпоінти виконуються в обмеженому пулі потоків
+        to_thread.current_default_thread_limiter().total_tokens = get_settings().api_threadpool_size
+
         DatabaseConnection.connect()
 
         if not validate_admin_configuration():
@@ -1,10 +1,14 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from backend.services.auth_service import AuthService
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__, "middleware.log")
 
+# Один екземпляр сервісу на процес замість створення репозиторіїв на кожен запит
+auth_service = AuthService()
+
 # Конфігурація доступу до ендпоінтів
 ENDPOINT_PERMISSIONS = {
     # Публічні ендпоінти
@@ -88,9 +92,8 @@ async def auth_middleware(request: Request, call_next):
                 content={"success": False, "message": "Невірна схема авторизації"}
             )
 
-        # Використовуємо AuthService для перевірки токена
-        auth_service = AuthService()
-        current_user = auth_service.get_current_user_from_token(token)
+        # Використовуємо AuthService для перевірки токена (запит до БД - поза event loop)
+        current_user = await run_in_threadpool(auth_service.get_current_user_from_token, token)
 
         if not current_user:
             return JSONResponse(
@@ -148,5 +151,13 @@ def get_endpoint_permission(path: str, method: str) -> str | list[str] | None:
     if path.startswith("/video/") and path.endswith("/stream"):
         return None
 
+    # HLS плейлист - плеєр передає токен у query; сегменти - підписані посилання, перевірка в endpoint
+    if path.startswith("/video/") and "/hls/" in path:
+        return None
+
+    # Спрайти прев'ю використовуються як background-image, токен у query
+    if path.startswith("/video/") and "/thumbnails/" in path:
+        return None
+
     # За замовчуванням вимагаємо авторизацію
     return ["annotator", "admin", "super_admin"]
\ No newline at end of file
@@ -95,6 +95,11 @@ class VideoUploadRequest(BaseModel):
         return self
 
 
+class TaskProgressSubscriptionRequest(BaseModel):
+    """Task progress subscription request"""
+    task_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
 class VideoMetadataRequest(BaseModel):
     """Video metadata in request"""
     skip: bool = False
@@ -219,6 +224,28 @@ class VideoUploadResponse(BaseResponse):
     batch_results: Optional[Dict[str, Any]] = None
 
 
+class TaskProgressSubscriptionResponse(BaseResponse):
+    """Task progress subscription response"""
+    subscription_id: str
+
+
+class ThumbnailsIndexResponse(BaseResponse):
+    """Timeline thumbnail sprites index"""
+    interval: float
+    width: int
+    height: int
+    columns: int
+    rows: int
+    count: int
+    sheets: List[str]
+
+
+class KeyframeIndexResponse(BaseResponse):
+    """Delta-encoded keyframe times of the original video"""
+    unit: str = "ms"
+    deltas: List[int]
+
+
 class VideoInfoResponse(BaseModel):
     """Video info in list"""
     id: str
@@ -254,6 +281,7 @@ class LockVideoResponse(BaseResponse):
     """Lock video response"""
     message: str
     expires_at: Optional[str] = None
+    lease_seconds: Optional[int] = None
 
 
 class VideoStatusResponse(BaseResponse):
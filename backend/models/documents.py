@@ -139,6 +139,7 @@ class SourceVideoDocument(Document):
             'status',
             'created_at_utc',
             '-created_at_utc',
+            ('status', '-created_at_utc'),
         ]
     }
 
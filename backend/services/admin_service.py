@@ -8,6 +8,7 @@ from backend.database import (
     create_cvat_settings_repository
 )
 from backend.models.shared import UserRole, CVATSettings
+from backend.services.auth_service import AuthService
 from backend.models.api import (
     AdminStatsResponse, UserResponse, UserCreateResponse,
     UserDeleteResponse
@@ -163,6 +164,7 @@ class AdminService:
                 return {"success": True, "message": "Немає змін для оновлення"}
 
             success = self.user_repo.update_by_id(user_id, updates)
+            AuthService.invalidate_user_cache(user_id)
 
             if not success:
                 raise_business_error("Помилка оновлення користувача")
@@ -197,6 +199,7 @@ class AdminService:
                 raise_permission_error(current_user_role, f"видаляти {user_to_delete.role}")
 
             success = self.user_repo.delete_by_id(user_id)
+            AuthService.invalidate_user_cache(user_id)
 
             if not success:
                 raise_business_error("Помилка видалення користувача")
@@ -426,7 +429,7 @@ class AdminService:
 
             # Видаляємо локальний файл якщо існує
             from backend.utils.azure_path_utils import extract_filename_from_azure_path
-            from backend.utils.video_utils import get_local_video_path
+            from backend.utils.video_utils import get_local_video_path, cleanup_derived_files
             import os
 
             filename = extract_filename_from_azure_path(video.azure_file_path)
@@ -439,14 +442,15 @@ class AdminService:
                     except Exception as e:
                         logger.warning(f"Failed to delete local file {local_path}: {str(e)}")
 
+                # Недокачаний файл і маніфест від перерваного завантаження
+                from backend.utils.azure_utils import cleanup_partial_download
+                cleanup_partial_download(local_path)
+                cleanup_derived_files(filename)
+
             # Видаляємо всі пов'язані кліпи
             from backend.database import create_clip_video_repository
             clip_repo = create_clip_video_repository()
-            clips = clip_repo.get_all({"source_video_id": video_id})
-            deleted_clips = 0
-            for clip in clips:
-                clip.delete()
-                deleted_clips += 1
+            deleted_clips = clip_repo.delete_many({"source_video_id": video_id})
 
             # Видаляємо блокування з Redis якщо є
             try:
@@ -483,15 +487,13 @@ class AdminService:
         """Отримати список всіх відео для адмінів"""
         try:
             # Отримуємо всі відео (без фільтрації за статусом)
-            all_videos = self.video_repo.get_all()
-            all_videos.sort(key=lambda x: x.created_at_utc, reverse=True)
-
-            total_count = len(all_videos)
+            videos_for_page, total_count = self.video_repo.get_page(
+                order_by=["-created_at_utc"],
+                page=page,
+                per_page=per_page
+            )
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 1
 
-            offset = (page - 1) * per_page
-            videos_for_page = all_videos[offset:offset + per_page]
-
             # Отримуємо статуси блокування
             video_ids = [str(video.id) for video in videos_for_page]
             lock_statuses = self.lock_service.get_all_video_locks(video_ids)
@@ -29,7 +29,7 @@ class AnnotationService:
         self.draft_repo = create_annotation_draft_repository()
         self.cvat_service = CVATService()
 
-    async def save_fragments_and_metadata(self, azure_file_path: AzureFilePath, annotation_data: Dict[str, Any]) -> \
+    def save_fragments_and_metadata(self, azure_file_path: AzureFilePath, annotation_data: Dict[str, Any]) -> \
     Dict[str, Any]:
         """Save fragments and metadata with comprehensive validation"""
         existing = None
@@ -106,7 +106,7 @@ class AnnotationService:
                 "error": str(e)
             }
 
-    async def save_annotation_only(self, azure_file_path: AzureFilePath, annotation_data: Dict[str, Any]) -> Dict[str, Any]:
+    def save_annotation_only(self, azure_file_path: AzureFilePath, annotation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save annotation draft without starting clip processing"""
         try:
             metadata = annotation_data.get("metadata", {})
@@ -256,9 +256,7 @@ class AnnotationService:
     def delete_annotation(self, video_id: str) -> Dict[str, Any]:
         """Delete annotation and associated clips"""
         try:
-            clips = self.clip_repo.get_all({"source_video_id": video_id})
-            for clip in clips:
-                clip.delete()
+            deleted_clips = self.clip_repo.delete_many({"source_video_id": video_id})
 
             success = self.source_repo.delete_by_id(video_id)
 
@@ -268,11 +266,11 @@ class AnnotationService:
                     "error": f"Не вдалося видалити анотацію {video_id}"
                 }
 
-            logger.info(f"Annotation deleted: {video_id} with {len(clips)} clips")
+            logger.info(f"Annotation deleted: {video_id} with {deleted_clips} clips")
 
             return {
                 "success": True,
-                "message": f"Анотацію та {len(clips)} кліпів видалено"
+                "message": f"Анотацію та {deleted_clips} кліпів видалено"
             }
 
         except Exception as e:
@@ -286,9 +284,7 @@ class AnnotationService:
                                       clips: Dict[str, Any], metadata: Dict[str, Any]) -> None:
         """Create clip documents with unified metadata structure"""
         try:
-            existing_clips = self.clip_repo.get_all({"source_video_id": source_video_id})
-            for clip in existing_clips:
-                clip.delete()
+            clip_documents = []
 
             for project_name, project_clips in clips.items():
                 cvat_settings_doc = self.cvat_service.get_cvat_settings_document(project_name)
@@ -328,29 +324,36 @@ class AnnotationService:
                         blob_path=clip_azure_path.blob_path
                     )
 
-                    self.clip_repo.create(
-                        source_video_id=source_video_id,
-                        azure_file_path=azure_file_path_doc,
-                        cvat_task_params=cvat_settings_doc,  # Тепер це reference
-                        cvat_project_id=cvat_settings_doc.project_id,
-                        status="not_annotated",
-                        extension=extension,
-                        duration_sec=end_seconds - start_seconds,
-                        start_time_offset_sec=start_seconds,
-                        where=metadata.get("where", ""),
-                        when=metadata.get("when", ""),
-                        uav_type=metadata.get("uav_type", ""),
-                        video_content=metadata.get("video_content", ""),
-                        is_urban=metadata.get("is_urban", False),
-                        has_osd=metadata.get("has_osd", False),
-                        is_analog=metadata.get("is_analog", False),
-                        night_video=metadata.get("night_video", False),
-                        multiple_streams=metadata.get("multiple_streams", False),
-                        has_explosions=metadata.get("has_explosions", False),
-                        ml_project=project_name
-                    )
+                    clip_documents.append({
+                        "source_video_id": source_video_id,
+                        "azure_file_path": azure_file_path_doc,
+                        "cvat_task_params": cvat_settings_doc,  # Тепер це reference
+                        "cvat_project_id": cvat_settings_doc.project_id,
+                        "status": "not_annotated",
+                        "extension": extension,
+                        "duration_sec": end_seconds - start_seconds,
+                        "start_time_offset_sec": start_seconds,
+                        "where": metadata.get("where", ""),
+                        "when": metadata.get("when", ""),
+                        "uav_type": metadata.get("uav_type", ""),
+                        "video_content": metadata.get("video_content", ""),
+                        "is_urban": metadata.get("is_urban", False),
+                        "has_osd": metadata.get("has_osd", False),
+                        "is_analog": metadata.get("is_analog", False),
+                        "night_video": metadata.get("night_video", False),
+                        "multiple_streams": metadata.get("multiple_streams", False),
+                        "has_explosions": metadata.get("has_explosions", False),
+                        "ml_project": project_name
+                    })
+
+            # Спочатку вставляємо нові кліпи: якщо валідація не пройде, старі залишаться
+            created_clips = self.clip_repo.bulk_create(clip_documents)
+            self.clip_repo.delete_many({
+                "source_video_id": source_video_id,
+                "id__nin": [clip.id for clip in created_clips]
+            })
 
-            logger.info(f"Prepared clips for processing: {source_video_id}")
+            logger.info(f"Prepared {len(clip_documents)} clips for processing: {source_video_id}")
 
         except Exception as e:
             logger.error(f"Error preparing clips: {str(e)}")
@@ -1,5 +1,7 @@
+import time
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError
 from pydantic import EmailStr
@@ -15,6 +17,10 @@ from backend.config.settings import get_settings
 
 logger = get_logger(__name__, "services.log")
 
+# Кеш стану активності користувачів: user_id -> (час запису, is_active)
+_active_user_cache: Dict[str, Tuple[float, bool]] = {}
+_active_user_cache_lock = threading.Lock()
+
 
 class AuthService:
     """Service for authentication and authorization operations"""
@@ -129,14 +135,9 @@ class AuthService:
                 return None
 
             # For access tokens, verify user is still active
-            if token_type == "access":
-                user = self.user_repo.get_by_id(token_payload.user_id)
-                if not user:
-                    logger.warning(f"User not found during access token verification: {token_payload.user_id}")
-                    return None
-                if not user.is_active:
-                    logger.warning(f"Inactive user with valid access token: {token_payload.sub}")
-                    return None
+            if token_type == "access" and not self._is_user_active(token_payload.user_id):
+                logger.warning(f"Missing or inactive user with valid access token: {token_payload.sub}")
+                return None
 
             logger.debug(f"Token verification successful for {token_payload.sub}")
             return token_payload
@@ -153,6 +154,29 @@ class AuthService:
             logger.error(f"Token verification error: {str(e)}")
             return None
 
+    def _is_user_active(self, user_id: str) -> bool:
+        """Check user is active, using a short-TTL cache to avoid a DB lookup per request"""
+        now = time.monotonic()
+        cached = _active_user_cache.get(user_id)
+        if cached and now - cached[0] < self.settings.auth_user_cache_ttl_sec:
+            return cached[1]
+
+        user = self.user_repo.get_by_id(user_id)
+        is_active = bool(user and user.is_active)
+
+        with _active_user_cache_lock:
+            _active_user_cache[user_id] = (now, is_active)
+        return is_active
+
+    @staticmethod
+    def invalidate_user_cache(user_id: Optional[str] = None) -> None:
+        """Drop cached active state for one user or for all users"""
+        with _active_user_cache_lock:
+            if user_id is None:
+                _active_user_cache.clear()
+            else:
+                _active_user_cache.pop(user_id, None)
+
     def refresh_access_token(self, refresh_token: str) -> Optional[Token]:
         """
         Refresh access token using refresh token
@@ -1,7 +1,9 @@
 import os
-from typing import Dict, Any, List, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
-from azure.storage.blob import BlobServiceClient, ContainerClient
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, ContainerClient, BlobClient, BlobProperties
 
 from backend.utils.azure_utils import (
     get_blob_service_client, get_blob_container_client,
@@ -47,31 +49,25 @@ class AzureService:
         try:
             azure_path = parse_azure_blob_url_to_path(url)
 
-            if azure_path.account_name != settings.azure_storage_account_name:
-                return {
-                    "valid": False,
-                    "error": f"URL має бути з облікового запису '{settings.azure_storage_account_name}'"
-                }
-
-            if not validate_azure_path_structure(azure_path):
-                return {
-                    "valid": False,
-                    "error": "Невірна структура шляху Azure"
-                }
+            path_error = self._validate_path(azure_path)
+            if path_error:
+                return {"valid": False, "error": path_error}
 
             blob_client = self.blob_service_client.get_blob_client(
                 container=azure_path.container_name,
                 blob=azure_path.blob_path
             )
 
-            if not blob_client.exists():
+            # Один запит властивостей: 404 означає відсутній blob
+            try:
+                properties = blob_client.get_blob_properties()
+            except ResourceNotFoundError:
                 logger.error(f"Blob does not exist: {azure_path.blob_path}")
                 return {
                     "valid": False,
                     "error": "Файл не знайдено в Azure Storage"
                 }
 
-            properties = blob_client.get_blob_properties()
             filename = extract_filename_from_azure_path(azure_path)
 
             logger.info(f"Blob found: {filename}, size: {properties.size} bytes")
@@ -90,17 +86,29 @@ class AzureService:
                 "error": f"Помилка перевірки URL: {str(e)}"
             }
 
+    @staticmethod
+    def _validate_path(azure_path: AzureFilePath) -> Optional[str]:
+        """Check account and path structure without calling Azure, return error message if invalid"""
+        if azure_path.account_name != settings.azure_storage_account_name:
+            return f"URL має бути з облікового запису '{settings.azure_storage_account_name}'"
+
+        if not validate_azure_path_structure(azure_path):
+            return "Невірна структура шляху Azure"
+
+        return None
+
     @staticmethod
     def download_video_to_local_with_progress(
             azure_path: AzureFilePath,
             local_path: str,
-            progress_callback: Optional[Callable[[int, int], None]] = None
+            progress_callback: Optional[Callable[[int, int], None]] = None,
+            contiguous_callback: Optional[Callable[[int], None]] = None
     ) -> Dict[str, Any]:
-        """Download video from Azure Storage locally with progress tracking"""
+        """Download video from Azure Storage locally with progress tracking (resumable for large blobs)"""
         try:
             azure_url = azure_path_to_url(azure_path)
             return download_blob_to_local_parallel_with_progress(
-                azure_url, local_path, progress_callback
+                azure_url, local_path, progress_callback, contiguous_callback
             )
 
         except Exception as e:
@@ -110,6 +118,14 @@ class AzureService:
                 "error": str(e)
             }
 
+    def get_blob_with_properties(self, azure_path: AzureFilePath) -> Tuple[BlobClient, BlobProperties]:
+        """Get blob client together with its properties (raises ResourceNotFoundError if missing)"""
+        blob_client = self.blob_service_client.get_blob_client(
+            container=azure_path.container_name,
+            blob=azure_path.blob_path
+        )
+        return blob_client, blob_client.get_blob_properties()
+
     def upload_clip(self, file_path: str, azure_path: AzureFilePath, metadata: Dict[str, str]) -> Dict[str, Any]:
         """Upload processed clip to Azure Storage with metadata"""
         try:
@@ -246,17 +262,44 @@ class AzureService:
             return []
 
     def batch_validate_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
-        """Validate multiple Azure URLs efficiently"""
+        """Validate multiple Azure URLs concurrently over a bounded executor"""
+        if not urls:
+            return {}
+
+        # Ініціалізуємо клієнт до розгалуження, щоб потоки не створювали власні
+        _ = self.blob_service_client
+
+        with ThreadPoolExecutor(max_workers=min(settings.azure_validation_concurrency, len(urls))) as executor:
+            validation_results = executor.map(self._validate_url_safely, urls)
+            return dict(zip(urls, validation_results))
+
+    def _validate_url_safely(self, url: str) -> Dict[str, Any]:
+        """Validate URL, turning unexpected errors into a failed result"""
+        try:
+            return self.validate_azure_url(url)
+        except Exception as e:
+            return {
+                "valid": False,
+                "error": f"Помилка валідації: {str(e)}"
+            }
+
+    def validate_listed_videos(self, videos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Build validation results for blobs from list_videos_in_folder without re-fetching them"""
         results = {}
 
-        for url in urls:
-            try:
-                validation_result = self.validate_azure_url(url)
-                results[url] = validation_result
-            except Exception as e:
-                results[url] = {
-                    "valid": False,
-                    "error": f"Помилка валідації: {str(e)}"
-                }
+        for video_info in videos:
+            azure_path = video_info["azure_path"]
+            path_error = self._validate_path(azure_path)
+
+            if path_error:
+                results[video_info["url"]] = {"valid": False, "error": path_error}
+                continue
+
+            results[video_info["url"]] = {
+                "valid": True,
+                "filename": video_info["filename"],
+                "azure_path": azure_path,
+                "size_bytes": video_info["size_bytes"]
+            }
 
         return results
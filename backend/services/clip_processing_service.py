@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import os
 import tempfile
 
@@ -6,7 +6,8 @@ from backend.database import create_source_video_repository, create_clip_video_r
 from backend.models.shared import AzureFilePath
 from backend.utils.azure_path_utils import extract_filename_from_azure_path
 from backend.utils.video_utils import (
-    trim_video_clip, cleanup_file, get_local_video_path, get_video_info
+    trim_video_clip, trim_video_clips_batch, cleanup_file,
+    get_local_video_path, cleanup_derived_files, get_video_info, get_keyframe_index, keyframe_at_or_before
 )
 from backend.services.azure_service import AzureService
 from backend.services.cvat_service import CVATService
@@ -27,9 +28,14 @@ class ClipProcessingService:
         self.cvat_service = CVATService()
 
     def process_single_clip(self, clip_video_id: str) -> Dict[str, Any]:
-        """Process individual video clip"""
+        """Process individual video clip, reusing the file cut by its lane's batch cut if present
+
+        Handled failures are recorded on the clip and returned; unexpected errors are raised
+        so the clip chain stops and the chord error callback fails the source video.
+        """
         logger.debug(f"Starting clip processing: {clip_video_id}")
         temp_clip_path = None
+        prepared_clip_path = None
 
         try:
             clip_data = self.clip_repo.get_by_id(clip_video_id)
@@ -42,7 +48,11 @@ class ClipProcessingService:
                 logger.error(f"Source video not found: {clip_data.source_video_id}")
                 return {"status": "error", "message": "Відео-джерело не знайдено"}
 
-            temp_clip_path = self._create_clip_file(clip_data, source_video)
+            prepared_clip_path = self._get_prepared_clip_path(clip_data)
+            if os.path.exists(prepared_clip_path):
+                temp_clip_path = prepared_clip_path
+            else:
+                temp_clip_path = self._create_clip_file(clip_data, source_video)
             if not temp_clip_path:
                 self.clip_repo.update_by_id(clip_video_id, {"status": "clip_creation_failed"})
                 return {"status": "error", "message": "Не вдалося створити файл кліпу"}
@@ -93,73 +103,163 @@ class ClipProcessingService:
                 self.clip_repo.update_by_id(clip_video_id, {"status": "processing_failed"})
             except:
                 pass
-            return {"status": "error", "message": str(e)}
+            raise
         finally:
             if temp_clip_path:
                 cleanup_file(temp_clip_path)
+            if prepared_clip_path and prepared_clip_path != temp_clip_path:
+                cleanup_file(prepared_clip_path)
 
-    def process_all_clips_for_video(self, source_video_id: str) -> Dict[str, Any]:
-        """Process all clips for a source video"""
-        logger.info(f"Starting processing all clips for source video: {source_video_id}")
+    def get_clips_for_video(self, source_video_id: str) -> List[Any]:
+        """Get all clip documents of a source video"""
+        return self.clip_repo.get_all(filter_dict={"source_video_id": source_video_id})
 
-        try:
-            clips = self.clip_repo.get_all(filter_dict={"source_video_id": source_video_id})
+    def plan_clip_lanes(self, clips: List[Any], lane_count: int) -> List[List[List[Any]]]:
+        """Spread batch-cut groups over lanes, keeping each group whole inside one lane"""
+        lanes = [[] for _ in range(lane_count)]
+        lane_sizes = [0] * lane_count
+
+        for group in self._group_clips_for_batch_cut(clips):
+            lane_index = lane_sizes.index(min(lane_sizes))
+            lanes[lane_index].append(group)
+            lane_sizes[lane_index] += len(group)
+
+        return [lane for lane in lanes if lane]
 
+    def cut_clip_group(self, clip_video_ids: List[str]) -> Dict[str, Any]:
+        """Cut a group of clips in one pass right before its clip tasks run in the lane"""
+        clips = self.clip_repo.get_all(filter_dict={"id__in": clip_video_ids})
+        if not clips:
+            return {"status": "error", "message": "Кліпи не знайдено"}
+
+        local_source_path, keyframes = self._get_source_path_and_keyframes(clips[0].source_video_id)
+        if not keyframes:
+            # Без індексу ключових кадрів кожен кліп нарізається окремо в process_single_clip
+            return {"status": "skipped", "prepared_clips": 0}
+
+        prepared_count = self._cut_clip_group(clips, local_source_path, keyframes)
+        logger.info(f"Pre-cut {prepared_count}/{len(clips)} clips in a batch")
+        return {"status": "success", "prepared_clips": prepared_count}
+
+    def finalize_clips_processing(self, source_video_id: str) -> Dict[str, Any]:
+        """Summarise clip statuses once every clip task has finished and finalize the source video"""
+        logger.info(f"Finalizing clips processing for source video: {source_video_id}")
+
+        try:
+            clips = self.get_clips_for_video(source_video_id)
             if not clips:
-                logger.warning(f"No clips found for source video: {source_video_id}")
                 self.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
                 return {"status": "error", "message": "Не знайдено кліпів для обробки"}
 
-            results = self._process_clips_batch(clips)
+            successful_clips = len([c for c in clips if c.status == "not_annotated" and c.cvat_task_id])
+            partial_success_clips = len([c for c in clips if c.status == "cvat_failed"])
 
-            if results["failed_clips"] == 0:
-                self._finalize_video_processing(source_video_id, clips)
+            results = {
+                "successful_clips": successful_clips,
+                "partial_success_clips": partial_success_clips,
+                "failed_clips": len(clips) - successful_clips - partial_success_clips,
+                "total_clips": len(clips)
+            }
 
-                return {
-                    "status": "completed",
-                    "message": "Обробка всіх кліпів завершена",
-                    **results
-                }
-            else:
-                self.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
-                return {
-                    "status": "partial_success",
-                    "message": f"Обробка завершена з помилками. Оброблено {results['successful_clips'] + results['partial_success_clips']} з {results['total_clips']} кліпів",
-                    **results
-                }
+            return self._complete_video_processing(source_video_id, clips, results)
 
         except Exception as e:
-            logger.error(f"Error processing clips for video {source_video_id}: {str(e)}")
+            logger.error(f"Error finalizing clips for video {source_video_id}: {str(e)}")
             self.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
             return {"status": "error", "message": str(e)}
 
+    def fail_clips_processing(self, source_video_id: str, error: str) -> None:
+        """Mark source video failed when a clip chain of its chord stopped before finalization"""
+        logger.error(f"Clips processing failed for video {source_video_id}: {error}")
+        self.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
+
+        # Кліпи, нарізані наперед для задач, що вже не виконаються
+        for clip in self.get_clips_for_video(source_video_id):
+            prepared_clip_path = self._get_prepared_clip_path(clip)
+            if os.path.exists(prepared_clip_path):
+                cleanup_file(prepared_clip_path)
+
+    def _complete_video_processing(self, source_video_id: str, clips: List[Any],
+                                   results: Dict[str, int]) -> Dict[str, Any]:
+        """Mark source video as annotated or failed based on clip results"""
+        if results["failed_clips"] == 0:
+            self._finalize_video_processing(source_video_id, clips)
+
+            return {
+                "status": "completed",
+                "message": "Обробка всіх кліпів завершена",
+                **results
+            }
+
+        self.source_repo.update_by_id(source_video_id, {"status": "annotation_error"})
+        return {
+            "status": "partial_success",
+            "message": f"Обробка завершена з помилками. Оброблено {results['successful_clips'] + results['partial_success_clips']} з {results['total_clips']} кліпів",
+            **results
+        }
+
+    def _get_source_path_and_keyframes(self, source_video_id: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """Get local source path and its keyframe times for batch cutting"""
+        source_video = self.source_repo.get_by_id(source_video_id)
+        if not source_video:
+            return None, None
+
+        local_source_path = self._get_local_source_path(source_video)
+        if not os.path.exists(local_source_path):
+            return local_source_path, None
+
+        return local_source_path, get_keyframe_index(local_source_path)
+
+    @staticmethod
+    def _get_local_source_path(source_video) -> str:
+        """Get local path of the downloaded source video"""
+        source_azure_path = AzureFilePath(
+            account_name=source_video.azure_file_path.account_name,
+            container_name=source_video.azure_file_path.container_name,
+            blob_path=source_video.azure_file_path.blob_path
+        )
+        return get_local_video_path(extract_filename_from_azure_path(source_azure_path))
+
+    @staticmethod
+    def _create_temp_clip_path(clip_data) -> str:
+        """Reserve a temp file for a clip"""
+        temp_clip_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            suffix=f".{clip_data.extension}",
+            dir=settings.temp_folder
+        )
+        temp_clip_file.close()
+        return temp_clip_file.name
+
+    @staticmethod
+    def _get_prepared_clip_path(clip_data) -> str:
+        """Fixed location of a clip cut ahead by its group, so the clip task can find it"""
+        return os.path.join(settings.temp_folder, f"prepared_clip_{clip_data.id}.{clip_data.extension}")
+
     def _create_clip_file(self, clip_data, source_video) -> Optional[str]:
         """Create clip file from source video"""
         try:
-            source_azure_path = AzureFilePath(
-                account_name=source_video.azure_file_path.account_name,
-                container_name=source_video.azure_file_path.container_name,
-                blob_path=source_video.azure_file_path.blob_path
-            )
-
-            source_filename = extract_filename_from_azure_path(source_azure_path)
-            local_source_path = get_local_video_path(source_filename)
+            local_source_path = self._get_local_source_path(source_video)
 
             if not os.path.exists(local_source_path):
                 logger.error(f"Local source file not found: {local_source_path}")
                 return None
 
-            temp_clip_file = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=f".{clip_data.extension}",
-                dir=settings.temp_folder
-            )
-            temp_clip_path = temp_clip_file.name
-            temp_clip_file.close()
+            temp_clip_path = self._create_temp_clip_path(clip_data)
 
             start_time = self._seconds_to_time_string(clip_data.start_time_offset_sec)
             end_time = self._seconds_to_time_string(clip_data.start_time_offset_sec + clip_data.duration_sec)
 
+            # Копіювання потоку починається з ключового кадру - шукаємо його явно, щоб знати зсув
+            keyframes = get_keyframe_index(local_source_path)
+            if keyframes:
+                seek_point = keyframe_at_or_before(keyframes, clip_data.start_time_offset_sec)
+                snap_offset = clip_data.start_time_offset_sec - seek_point
+                if snap_offset > 0:
+                    logger.info(f"Clip start snapped {snap_offset:.3f}s earlier to keyframe at {seek_point:.3f}s")
+                # +1 мс, щоб округлений час не потрапив перед ключовий кадр і не зсунув пошук на попередній
+                start_time = f"{seek_point + 0.001:.3f}"
+
             clip_filename = extract_filename_from_azure_path(
                 AzureFilePath(
                     account_name=clip_data.azure_file_path.account_name,
@@ -242,45 +342,55 @@ class ClipProcessingService:
             logger.error(f"CVAT task creation failed: {str(e)}")
             return None
 
-    def _process_clips_batch(self, clips: List[Any]) -> Dict[str, int]:
-        """Process batch of clips and collect statistics"""
-        successful_clips = 0
-        failed_clips = 0
-        partial_success_clips = 0
-        total_clips = len(clips)
+    def _group_clips_for_batch_cut(self, clips: List[Any]) -> List[List[Any]]:
+        """Group clips that lie close together so each group is cut in one pass over the source"""
+        groups = []
+        current_group = []
+        current_end = 0
 
-        logger.info(f"Processing {total_clips} clips")
+        for clip in sorted(clips, key=lambda c: c.start_time_offset_sec):
+            clip_end = clip.start_time_offset_sec + clip.duration_sec
 
-        for i, clip in enumerate(clips, 1):
-            logger.info(f"Processing clip {i}/{total_clips}: {str(clip.id)}")
+            if (current_group
+                    and clip.start_time_offset_sec - current_end <= settings.clip_batch_max_gap_sec
+                    and len(current_group) < settings.clip_batch_max_outputs):
+                current_group.append(clip)
+                current_end = max(current_end, clip_end)
+            else:
+                if current_group:
+                    groups.append(current_group)
+                current_group = [clip]
+                current_end = clip_end
+
+        if current_group:
+            groups.append(current_group)
+
+        return groups
+
+    def _cut_clip_group(self, clips: List[Any], local_source_path: str, keyframes: List[float]) -> int:
+        """Cut a group of clips with one ffmpeg run, returns how many clips were prepared"""
+        batch = []
+        for clip in clips:
+            batch.append({
+                "prepared_path": self._get_prepared_clip_path(clip),
+                "output_path": self._create_temp_clip_path(clip),
+                "start_sec": clip.start_time_offset_sec,
+                "end_sec": clip.start_time_offset_sec + clip.duration_sec
+            })
 
-            try:
-                result = self.process_single_clip(str(clip.id))
-
-                if result.get("status") == "success":
-                    successful_clips += 1
-                elif result.get("status") == "partial_success":
-                    partial_success_clips += 1
-                    logger.warning(f"Clip partially processed: {str(clip.id)} - {result.get('message')}")
-                else:
-                    failed_clips += 1
-                    logger.error(f"Clip processing failed: {str(clip.id)} - {result.get('message')}")
-
-            except Exception as e:
-                failed_clips += 1
-                logger.error(f"Error processing clip {str(clip.id)}: {str(e)}")
-
-        logger.info(f"Clip processing results: "
-                    f"successful {successful_clips}/{total_clips}, "
-                    f"partial {partial_success_clips}/{total_clips}, "
-                    f"failed {failed_clips}/{total_clips}")
+        results = trim_video_clips_batch(local_source_path, batch, keyframes)
 
-        return {
-            "successful_clips": successful_clips,
-            "partial_success_clips": partial_success_clips,
-            "failed_clips": failed_clips,
-            "total_clips": total_clips
-        }
+        prepared_count = 0
+        for item in batch:
+            if results.get(item["output_path"]):
+                # Переміщуємо лише готовий файл, щоб обірвана нарізка не сприйнялась як готовий кліп
+                os.replace(item["output_path"], item["prepared_path"])
+                prepared_count += 1
+            else:
+                # Кліп буде нарізано окремо в process_single_clip
+                cleanup_file(item["output_path"])
+
+        return prepared_count
 
     def _finalize_video_processing(self, source_video_id: str, clips: List[Any]) -> None:
         """Finalize video processing after all clips are done"""
@@ -301,6 +411,7 @@ class ClipProcessingService:
                         logger.info(f"Cleaned up local source file: {local_path}")
                     except Exception as e:
                         logger.error(f"Error cleaning up source file {local_path}: {str(e)}")
+                cleanup_derived_files(source_filename)
 
             clip_ids = [str(clip.id) for clip in clips]
             self.source_repo.update_by_id(source_video_id, {
@@ -1,11 +1,11 @@
-import re
-import subprocess
-import shlex
 from typing import Dict, Any, Optional
 
+import requests
+
 from backend.config.settings import get_settings
 from backend.database import create_cvat_settings_repository
 from backend.models.shared import MLProject, CVATSettings
+from backend.utils.cvat_client import get_cvat_client, CVATClientError
 from backend.utils.logger import get_logger
 
 settings = get_settings()
@@ -17,6 +17,7 @@ class CVATService:
 
     def __init__(self) -> None:
         self.settings_repo = create_cvat_settings_repository()
+        self.client = get_cvat_client()
 
     def get_default_project_params(self, project_name: str) -> Dict[str, Any]:
         """Get CVAT project parameters from database or fallback to defaults"""
@@ -55,7 +56,8 @@ class CVATService:
         return self.settings_repo.get_by_field("project_name", project_name)
 
     def create_task(self, filename: str, file_path: str, project_params: Dict[str, Any]) -> Optional[str]:
-        """Create CVAT task using CLI with comprehensive error handling"""
+        """Create CVAT task through the REST API with comprehensive error handling"""
+        task_id = None
         try:
             if not self._validate_create_task_params(filename, file_path, project_params):
                 return None
@@ -65,48 +67,41 @@ class CVATService:
             segment_size = project_params.get("segment_size", 400)
             image_quality = project_params.get("image_quality", 100)
 
-            cli_command = [
-                "cvat-cli",
-                "--auth", f"{shlex.quote(settings.cvat_username)}:{shlex.quote(settings.cvat_password)}",
-                "--server-host", shlex.quote(settings.cvat_host),
-                "--server-port", str(settings.cvat_port),
-                "create", shlex.quote(filename),
-                "local", shlex.quote(file_path),
-                "--project_id", str(project_id),
-                "--overlap", str(overlap),
-                "--segment_size", str(segment_size),
-                "--image_quality", str(image_quality),
-                "--use_cache",
-                "--use_zip_chunks"
-            ]
-
             logger.info(f"Creating CVAT task for {filename} in project {project_id}")
-            logger.debug(f"CVAT CLI command: {' '.join(cli_command)}")
-
-            result = subprocess.run(cli_command, capture_output=True, text=True, timeout=300)
-
-            logger.debug(f"CVAT CLI stdout: {result.stdout}")
-            logger.debug(f"CVAT CLI stderr: {result.stderr}")
-            logger.debug(f"CVAT CLI return code: {result.returncode}")
-
-            if result.returncode == 0:
-                task_id = self._extract_task_id_from_output(result.stdout)
-                if task_id:
-                    logger.info(f"CVAT task created successfully: {task_id} for {filename}")
-                    return task_id
-                else:
-                    logger.error(f"Failed to extract task ID from output for {filename}: {result.stdout}")
-                    return None
-            else:
-                logger.error(f"CVAT task creation failed for {filename}: stdout={result.stdout}, stderr={result.stderr}")
+
+            task_id = self.client.create_task(filename, project_id, overlap, segment_size)
+            self.client.upload_task_data(task_id, file_path, {
+                "image_quality": image_quality,
+                "use_cache": True,
+                "use_zip_chunks": True
+            })
+
+            status = self.client.wait_for_task(task_id, timeout=settings.cvat_task_timeout)
+            if status.get("state") != "Finished":
+                logger.error(f"CVAT task {task_id} data processing failed for {filename}: {status.get('message')}")
+                self._delete_failed_task(task_id)
                 return None
 
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout during CVAT task creation for {filename}")
-            return None
+            logger.info(f"CVAT task created successfully: {task_id} for {filename}")
+            return str(task_id)
+
+        except CVATClientError as e:
+            logger.error(f"CVAT task creation failed for {filename}: {str(e)}")
+        except requests.RequestException as e:
+            logger.error(f"CVAT request error for {filename}: {str(e)}")
         except Exception as e:
             logger.error(f"Error creating CVAT task for {filename}: {str(e)}")
-            return None
+
+        if task_id:
+            self._delete_failed_task(task_id)
+        return None
+
+    def _delete_failed_task(self, task_id: int) -> None:
+        """Remove a task left without data so it does not clutter the project"""
+        try:
+            self.client.delete_task(task_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete incomplete CVAT task {task_id}: {str(e)}")
 
     @staticmethod
     def _validate_project_name(project_name: str) -> bool:
@@ -132,12 +127,6 @@ class CVATService:
 
         return True
 
-    @staticmethod
-    def _extract_task_id_from_output(output: str) -> Optional[str]:
-        """Extract task ID from CVAT CLI output using regex"""
-        match = re.search(r"Created task ID: (\d+)", output)
-        return match.group(1) if match else None
-
     @staticmethod
     def _get_hardcoded_defaults(project_name: str) -> Dict[str, Any]:
         """Get hardcoded default parameters for CVAT projects"""
@@ -0,0 +1,88 @@
+import json
+import time
+import uuid
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+from starlette.concurrency import run_in_threadpool
+
+from backend.config.settings import get_settings
+from backend.services.video_service import VideoService
+from backend.utils.logger import get_logger
+from backend.utils.progress_events import get_progress_channel, TERMINAL_TASK_STATUSES
+
+settings = get_settings()
+logger = get_logger(__name__, "services.log")
+
+SUBSCRIPTION_KEY_PREFIX = "task_progress_sub:"
+SUBSCRIPTION_TTL_SEC = 24 * 60 * 60
+KEEPALIVE_INTERVAL_SEC = 15
+
+
+class TaskProgressService:
+    """Server-sent progress stream for Celery processing tasks"""
+
+    def __init__(self):
+        self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+
+    def create_subscription(self, task_ids: List[str]) -> str:
+        """Store the task set server-side so the EventSource URL stays short"""
+        subscription_id = uuid.uuid4().hex
+        unique_ids = list(dict.fromkeys(task_ids))
+        self.redis_client.set(
+            f"{SUBSCRIPTION_KEY_PREFIX}{subscription_id}",
+            json.dumps(unique_ids),
+            ex=SUBSCRIPTION_TTL_SEC
+        )
+        return subscription_id
+
+    def get_subscription(self, subscription_id: str) -> Optional[List[str]]:
+        """Task ids of a subscription or None if it expired"""
+        raw = self.redis_client.get(f"{SUBSCRIPTION_KEY_PREFIX}{subscription_id}")
+        return json.loads(raw) if raw else None
+
+    @staticmethod
+    def _format_event(payload: Dict[str, Any]) -> str:
+        return f"data: {json.dumps(payload, default=str)}\n\n"
+
+    async def stream(self, task_ids: List[str], is_disconnected) -> AsyncIterator[str]:
+        """Yield SSE frames until every task reaches a terminal state or the client leaves"""
+        pending = set(task_ids)
+        client = aioredis.from_url(settings.redis_url, decode_responses=True)
+        pubsub = client.pubsub()
+
+        try:
+            # Підписуємось до знімка стану, щоб не пропустити події між ними
+            await pubsub.subscribe(*[get_progress_channel(task_id) for task_id in task_ids])
+
+            for task_id in task_ids:
+                snapshot = await run_in_threadpool(VideoService.get_task_status, task_id)
+                snapshot["task_id"] = task_id
+                yield self._format_event(snapshot)
+                if snapshot.get("status") in TERMINAL_TASK_STATUSES:
+                    pending.discard(task_id)
+
+            last_sent = time.monotonic()
+            while pending:
+                if await is_disconnected():
+                    break
+
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    payload = json.loads(message["data"])
+                    yield self._format_event(payload)
+                    last_sent = time.monotonic()
+                    if payload.get("status") in TERMINAL_TASK_STATUSES:
+                        pending.discard(payload.get("task_id"))
+                    continue
+
+                if time.monotonic() - last_sent >= KEEPALIVE_INTERVAL_SEC:
+                    yield ": keepalive\n\n"
+                    last_sent = time.monotonic()
+
+        except Exception as e:
+            logger.error(f"Error in task progress stream: {str(e)}")
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
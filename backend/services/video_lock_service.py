@@ -1,5 +1,6 @@
+import time
 import redis
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 
@@ -11,93 +12,166 @@ settings = get_settings()
 logger = get_logger(__name__, "services.log")
 
 
+LOCK_KEY_PREFIX = "video_lock:"
+# Індекс блокувань: sorted set video_id -> unix-час завершення оренди
+LOCK_INDEX_KEY = "video_locks:index"
+LOCK_BATCH_SIZE = 500
+
+# Атомарне захоплення блокування разом із записом в індекс
+ACQUIRE_LOCK_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    redis.call('ZADD', KEYS[2], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+# Продовження блокування лише власником (порівняння user_id в JSON payload)
+EXTEND_LOCK_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+if cjson.decode(current)['user_id'] ~= ARGV[1] then
+    return 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[4])
+return 1
+"""
+
+# Зняття блокування лише власником: 1 - знято, 0 - чуже, -1 - не існує
+RELEASE_LOCK_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    redis.call('ZREM', KEYS[2], ARGV[2])
+    return -1
+end
+if cjson.decode(current)['user_id'] ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[2])
+return 1
+"""
+
+
 class VideoLockService:
     """Сервіс для блокування відео через Redis"""
 
     def __init__(self):
         self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-        self.lock_timeout = 3600  # 1 година в секундах
+        self.lock_timeout = settings.video_lock_lease_sec
+        self._acquire_lock = self.redis_client.register_script(ACQUIRE_LOCK_SCRIPT)
+        self._extend_lock = self.redis_client.register_script(EXTEND_LOCK_SCRIPT)
+        self._release_lock = self.redis_client.register_script(RELEASE_LOCK_SCRIPT)
 
     def lock_video(self, video_id: str, user_id: str, user_email: str) -> Dict[str, Any]:
-        """Блокує відео для користувача"""
+        """Атомарно блокує відео для користувача (SET NX EX)"""
         try:
-            lock_key = f"video_lock:{video_id}"
+            lock_key = f"{LOCK_KEY_PREFIX}{video_id}"
+
+            lock_data = {
+                "user_id": user_id,
+                "user_email": user_email,
+                "locked_at": datetime.now().isoformat()
+            }
 
-            # Перевіряємо чи відео вже заблоковане
-            existing_lock = self.redis_client.get(lock_key)
-            if existing_lock:
-                lock_data = json.loads(existing_lock)
+            # Дві спроби: ключ міг зникнути між SET NX і перевіркою власника
+            for _ in range(2):
+                if self._acquire_lock(keys=[lock_key, LOCK_INDEX_KEY],
+                                      args=[json.dumps(lock_data), self.lock_timeout, self._lease_expiry(), video_id]):
+                    logger.info(f"Відео {video_id} заблоковано користувачем {user_email}")
+
+                    return {
+                        "success": True,
+                        "message": "Відео успішно заблоковано",
+                        "expires_at": (datetime.now() + timedelta(seconds=self.lock_timeout)).isoformat(),
+                        "lease_seconds": self.lock_timeout
+                    }
 
                 # Якщо відео заблоковане тим же користувачем - продовжуємо роботу
-                if lock_data['user_id'] == user_id:
-                    # Продовжуємо існуюче блокування
-                    ttl = self.redis_client.ttl(lock_key)
+                if self._extend_lock(keys=[lock_key, LOCK_INDEX_KEY],
+                                 args=[user_id, self.lock_timeout, self._lease_expiry(), video_id]):
                     logger.info(f"Відео {video_id} вже заблоковане користувачем {user_email}, продовжуємо роботу")
 
                     return {
                         "success": True,
                         "message": "Продовжуємо роботу з відео",
-                        "expires_at": (datetime.now() + timedelta(seconds=ttl)).isoformat()
+                        "expires_at": (datetime.now() + timedelta(seconds=self.lock_timeout)).isoformat(),
+                        "lease_seconds": self.lock_timeout
                     }
-                else:
+
+                existing_lock = self.redis_client.get(lock_key)
+                if existing_lock:
                     # Відео заблоковане іншим користувачем
+                    existing_data = json.loads(existing_lock)
                     return {
                         "success": False,
-                        "error": f"Відео вже заблоковане користувачем {lock_data['user_email']}",
-                        "locked_by": lock_data['user_email'],
-                        "locked_at": lock_data['locked_at']
+                        "error": f"Відео вже заблоковане користувачем {existing_data['user_email']}",
+                        "locked_by": existing_data['user_email'],
+                        "locked_at": existing_data['locked_at']
                     }
 
-            # Створюємо нове блокування
-            lock_data = {
-                "user_id": user_id,
-                "user_email": user_email,
-                "locked_at": datetime.now().isoformat()
+            return {
+                "success": False,
+                "error": "Не вдалося заблокувати відео, спробуйте ще раз"
+            }
+
+        except Exception as e:
+            logger.error(f"Помилка блокування відео {video_id}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
             }
 
-            # Встановлюємо блокування з TTL
-            self.redis_client.setex(lock_key, self.lock_timeout, json.dumps(lock_data))
+    def extend_video_lock(self, video_id: str, user_id: str) -> Dict[str, Any]:
+        """Продовжує блокування власника (heartbeat з редактора)"""
+        try:
+            lock_key = f"{LOCK_KEY_PREFIX}{video_id}"
 
-            logger.info(f"Відео {video_id} заблоковано користувачем {user_email}")
+            if not self._extend_lock(keys=[lock_key, LOCK_INDEX_KEY],
+                                 args=[user_id, self.lock_timeout, self._lease_expiry(), video_id]):
+                return {
+                    "success": False,
+                    "error": "Блокування відео втрачено"
+                }
 
             return {
                 "success": True,
-                "message": "Відео успішно заблоковано",
-                "expires_at": (datetime.now() + timedelta(seconds=self.lock_timeout)).isoformat()
+                "message": "Блокування продовжено",
+                "expires_at": (datetime.now() + timedelta(seconds=self.lock_timeout)).isoformat(),
+                "lease_seconds": self.lock_timeout
             }
 
         except Exception as e:
-            logger.error(f"Помилка блокування відео {video_id}: {str(e)}")
+            logger.error(f"Помилка продовження блокування {video_id}: {str(e)}")
             return {
                 "success": False,
                 "error": str(e)
             }
 
     def unlock_video(self, video_id: str, user_id: str) -> Dict[str, Any]:
-        """Розблоковує відео"""
+        """Атомарно розблоковує відео, якщо ним володіє користувач"""
         try:
-            lock_key = f"video_lock:{video_id}"
+            lock_key = f"{LOCK_KEY_PREFIX}{video_id}"
 
-            existing_lock = self.redis_client.get(lock_key)
-            if not existing_lock:
+            released = self._release_lock(keys=[lock_key, LOCK_INDEX_KEY], args=[user_id, video_id])
+
+            if released == -1:
                 return {
                     "success": True,
                     "message": "Відео не було заблоковане"
                 }
 
-            lock_data = json.loads(existing_lock)
-
             # Перевіряємо чи може цей користувач розблокувати
-            if lock_data['user_id'] != user_id:
+            if released == 0:
                 return {
                     "success": False,
                     "error": "Ви не можете розблокувати відео іншого користувача"
                 }
 
-            # Видаляємо блокування
-            self.redis_client.delete(lock_key)
-
-            logger.info(f"Відео {video_id} розблоковано користувачем {lock_data['user_email']}")
+            logger.info(f"Відео {video_id} розблоковано користувачем {user_id}")
 
             return {
                 "success": True,
@@ -114,24 +188,14 @@ class VideoLockService:
     def get_video_lock_status(self, video_id: str) -> Dict[str, Any]:
         """Отримує статус блокування відео"""
         try:
-            lock_key = f"video_lock:{video_id}"
+            lock_key = f"{LOCK_KEY_PREFIX}{video_id}"
 
-            existing_lock = self.redis_client.get(lock_key)
-            if not existing_lock:
-                return {
-                    "locked": False
-                }
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.get(lock_key)
+            pipe.ttl(lock_key)
+            existing_lock, ttl = pipe.execute()
 
-            lock_data = json.loads(existing_lock)
-            ttl = self.redis_client.ttl(lock_key)
-
-            return {
-                "locked": True,
-                "locked_by": lock_data['user_email'],
-                "locked_at": lock_data['locked_at'],
-                "expires_in_seconds": ttl if ttl > 0 else 0,
-                "user_id": lock_data['user_id']
-            }
+            return self._build_lock_status(existing_lock, ttl)
 
         except Exception as e:
             logger.error(f"Помилка перевірки блокування {video_id}: {str(e)}")
@@ -141,31 +205,78 @@ class VideoLockService:
             }
 
     def get_all_video_locks(self, video_ids: list[str]) -> Dict[str, Dict[str, Any]]:
-        """Отримує статуси блокування для множини відео"""
+        """Отримує статуси блокування для множини відео за один запит до Redis"""
         try:
-            locks = {}
+            if not video_ids:
+                return {}
 
-            for video_id in video_ids:
-                locks[video_id] = self.get_video_lock_status(video_id)
+            lock_keys = [f"{LOCK_KEY_PREFIX}{video_id}" for video_id in video_ids]
 
-            return locks
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.mget(lock_keys)
+            for lock_key in lock_keys:
+                pipe.ttl(lock_key)
+            results = pipe.execute()
+
+            payloads, ttls = results[0], results[1:]
+
+            return {
+                video_id: self._build_lock_status(payload, ttl)
+                for video_id, payload, ttl in zip(video_ids, payloads, ttls)
+            }
 
         except Exception as e:
             logger.error(f"Помилка отримання блокувань: {str(e)}")
             return {}
 
+    @staticmethod
+    def _build_lock_status(existing_lock: Optional[str], ttl: int) -> Dict[str, Any]:
+        """Формує статус блокування з JSON payload і TTL ключа"""
+        if not existing_lock:
+            return {
+                "locked": False
+            }
+
+        lock_data = json.loads(existing_lock)
+
+        return {
+            "locked": True,
+            "locked_by": lock_data['user_email'],
+            "locked_at": lock_data['locked_at'],
+            "expires_in_seconds": ttl if ttl > 0 else 0,
+            "user_id": lock_data['user_id']
+        }
+
+    def _lease_expiry(self) -> int:
+        """Unix-час завершення нової оренди для індексу"""
+        return int(time.time()) + self.lock_timeout
+
     def cleanup_expired_locks(self) -> int:
-        """Очищає прострочені блокування (викликається автоматично Redis TTL)"""
+        """Очищає прострочені блокування за індексом (вартість залежить лише від кількості блокувань)"""
         try:
-            pattern = "video_lock:*"
-            keys = self.redis_client.keys(pattern)
+            expired_ids = self.redis_client.zrangebyscore(LOCK_INDEX_KEY, "-inf", int(time.time()))
 
             expired_count = 0
-            for key in keys:
-                ttl = self.redis_client.ttl(key)
-                if ttl == -1:  # Ключ без TTL
-                    self.redis_client.delete(key)
-                    expired_count += 1
+            for offset in range(0, len(expired_ids), LOCK_BATCH_SIZE):
+                batch = expired_ids[offset:offset + LOCK_BATCH_SIZE]
+
+                pipe = self.redis_client.pipeline(transaction=False)
+                for video_id in batch:
+                    pipe.ttl(f"{LOCK_KEY_PREFIX}{video_id}")
+                ttls = pipe.execute()
+
+                pipe = self.redis_client.pipeline(transaction=False)
+                stale_ids = []
+                for video_id, ttl in zip(batch, ttls):
+                    if ttl == -1:  # Ключ без TTL
+                        pipe.delete(f"{LOCK_KEY_PREFIX}{video_id}")
+                        stale_ids.append(video_id)
+                        expired_count += 1
+                    elif ttl == -2:  # Ключ вже видалено Redis TTL
+                        stale_ids.append(video_id)
+                if stale_ids:
+                    pipe.zrem(LOCK_INDEX_KEY, *stale_ids)
+                    pipe.execute()
 
             if expired_count > 0:
                 logger.info(f"Очищено {expired_count} прострочених блокувань")
@@ -181,59 +292,75 @@ class VideoLockService:
         try:
             # Базова інформація про Redis
             info = self.redis_client.info()
-            
-            # Кількість всіх video locks
-            pattern = "video_lock:*"
-            all_locks = self.redis_client.keys(pattern)
-            
+
+            now = int(time.time())
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zcount(LOCK_INDEX_KEY, f"({now}", "+inf")
+            pipe.zrangebyscore(LOCK_INDEX_KEY, "-inf", now)
+            pipe.zrange(LOCK_INDEX_KEY, 0, 9)  # Показуємо перші 10 для діагностики
+            active_count, expired_ids, sample_ids = pipe.execute()
+
+            # Прострочені за індексом ключі, які досі існують без TTL
+            pipe = self.redis_client.pipeline(transaction=False)
+            for video_id in expired_ids:
+                pipe.ttl(f"{LOCK_KEY_PREFIX}{video_id}")
+            expired_locks = sum(1 for ttl in pipe.execute() if ttl == -1) if expired_ids else 0
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for video_id in sample_ids:
+                pipe.get(f"{LOCK_KEY_PREFIX}{video_id}")
+                pipe.ttl(f"{LOCK_KEY_PREFIX}{video_id}")
+            sample_results = pipe.execute() if sample_ids else []
+
             locks_info = []
-            expired_locks = 0
-            
-            for key in all_locks:
+            for index, video_id in enumerate(sample_ids):
+                lock_data, ttl = sample_results[index * 2], sample_results[index * 2 + 1]
+                if not lock_data:
+                    continue
                 try:
-                    ttl = self.redis_client.ttl(key)
-                    lock_data = self.redis_client.get(key)
-                    
-                    if ttl == -1:
-                        expired_locks += 1
-                    
-                    if lock_data:
-                        parsed_data = json.loads(lock_data)
-                        locks_info.append({
-                            "key": key,
-                            "ttl": ttl,
-                            "user_email": parsed_data.get("user_email"),
-                            "locked_at": parsed_data.get("locked_at"),
-                            "expired": ttl == -1
-                        })
+                    parsed_data = json.loads(lock_data)
+                    locks_info.append({
+                        "key": f"{LOCK_KEY_PREFIX}{video_id}",
+                        "ttl": ttl,
+                        "user_email": parsed_data.get("user_email"),
+                        "locked_at": parsed_data.get("locked_at"),
+                        "expired": ttl == -1
+                    })
                 except Exception as e:
-                    logger.warning(f"Error processing lock key {key}: {str(e)}")
-            
+                    logger.warning(f"Error processing lock key {LOCK_KEY_PREFIX}{video_id}: {str(e)}")
+
             return {
                 "redis_connected": True,
                 "redis_memory_used": info.get("used_memory_human", "Unknown"),
                 "redis_total_connections": info.get("total_connections_received", 0),
-                "total_video_locks": len(all_locks),
+                "total_video_locks": active_count + expired_locks,
                 "expired_locks_without_ttl": expired_locks,
-                "locks_detail": locks_info[:10],  # Показуємо перші 10 для діагностики
+                "locks_detail": locks_info,
                 "redis_uptime": info.get("uptime_in_seconds", 0)
             }
-            
+
         except Exception as e:
             logger.error(f"Error getting Redis health info: {str(e)}")
             return {
                 "redis_connected": False,
                 "error": str(e)
             }
-    
+
     def force_cleanup_all_locks(self) -> Dict[str, Any]:
         """Примусове очищення всіх блокувань (для екстрених ситуацій)"""
         try:
-            pattern = "video_lock:*"
-            keys = self.redis_client.keys(pattern)
-            
-            if keys:
-                deleted = self.redis_client.delete(*keys)
+            keys = {f"{LOCK_KEY_PREFIX}{video_id}" for video_id in self.redis_client.zrange(LOCK_INDEX_KEY, 0, -1)}
+
+            # Інкрементальний SCAN підхоплює блокування, створені до появи індексу
+            keys.update(self.redis_client.scan_iter(match=f"{LOCK_KEY_PREFIX}*", count=1000))
+
+            deleted = 0
+            keys = list(keys)
+            for offset in range(0, len(keys), LOCK_BATCH_SIZE):
+                deleted += self.redis_client.delete(*keys[offset:offset + LOCK_BATCH_SIZE])
+            self.redis_client.delete(LOCK_INDEX_KEY)
+
+            if deleted:
                 logger.warning(f"Force deleted {deleted} video locks")
                 return {
                     "success": True,
@@ -246,7 +373,7 @@ class VideoLockService:
                     "deleted_locks": 0,
                     "message": "Немає блокувань для видалення"
                 }
-                
+
         except Exception as e:
             logger.error(f"Error in force cleanup: {str(e)}")
             return {
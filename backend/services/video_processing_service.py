@@ -1,19 +1,42 @@
 import os
+import bisect
+import shutil
 import subprocess
 import json
-from typing import Dict, Any, Optional, Callable
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Dict, Any, Optional, Callable, List, Tuple
 
 from backend.database import create_source_video_repository
 from backend.services.azure_service import AzureService
 from backend.models.shared import AzureFilePath, VideoStatus
 from backend.utils.azure_path_utils import extract_filename_from_azure_path
-from backend.utils.video_utils import get_local_video_path, cleanup_file
+from backend.utils.video_utils import (
+    get_local_video_path, get_local_proxy_path, get_local_hls_dir, get_local_thumbnails_dir,
+    cleanup_file, get_keyframe_index, format_vtt_timestamp,
+    HLS_PLAYLIST_NAME, HLS_INIT_NAME, HLS_SEGMENT_PATTERN,
+    THUMBNAILS_INDEX_NAME, THUMBNAILS_VTT_NAME, THUMBNAIL_SPRITE_PATTERN
+)
+from backend.utils.azure_utils import get_partial_download_path
 from backend.config.settings import get_settings
 from backend.utils.logger import get_logger
 
 settings = get_settings()
 logger = get_logger(__name__, "services.log")
 
+# Розмір блоку, яким .part файл подається в stdin ffmpeg
+PIPELINE_FEED_BLOCK_SIZE = 1024 * 1024
+
+
+class ConversionPlan(str, Enum):
+    """Cheapest conversion that makes a source web-compatible"""
+    NONE = "none"
+    REMUX = "remux"
+    AUDIO_ONLY = "audio_only"
+    FULL = "full"
+
 
 class VideoProcessingService:
     """Service for video download and conversion operations"""
@@ -41,33 +64,57 @@ class VideoProcessingService:
 
             self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOADING})
 
-            download_result = self.azure_service.download_video_to_local_with_progress(
-                azure_path, local_path, download_progress_callback
-            )
-
-            if not download_result["success"]:
-                self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOAD_ERROR})
-                return {
-                    "status": "error",
-                    "message": f'Помилка завантаження: {download_result["error"]}'
-                }
+            video_info = None
+            downloaded = False
+            if settings.pipelined_conversion:
+                video_info, downloaded = self._download_and_convert_pipelined(
+                    azure_path, local_path, download_progress_callback, conversion_progress_callback
+                )
 
-            video_info = self._get_video_info(local_path)
             if not video_info:
-                self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOAD_ERROR})
-                cleanup_file(local_path)
-                return {"status": "error", "message": "Не вдалося проаналізувати відео"}
-
-            if settings.skip_conversion_for_compatible and self._is_web_compatible(video_info):
-                logger.info(f"Video is already web-compatible, skipping conversion: {azure_path.blob_path}")
-            else:
-                converted_success = self._convert_to_web_format(
-                    local_path, video_info, conversion_progress_callback
-                )
-                if not converted_success:
+                # Якщо конвеєр уже завантажив джерело - лише конвертуємо, інакше докачуємо з .part
+                if not downloaded:
+                    download_result = self.azure_service.download_video_to_local_with_progress(
+                        azure_path, local_path, download_progress_callback
+                    )
+
+                    if not download_result["success"]:
+                        self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOAD_ERROR})
+                        return {
+                            "status": "error",
+                            "message": f'Помилка завантаження: {download_result["error"]}'
+                        }
+
+                video_info = self._get_video_info(local_path)
+                if not video_info:
                     self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOAD_ERROR})
                     cleanup_file(local_path)
-                    return {"status": "error", "message": "Помилка конвертації відео"}
+                    return {"status": "error", "message": "Не вдалося проаналізувати відео"}
+
+                plan = self._plan_conversion(video_info)
+
+                if plan == ConversionPlan.NONE:
+                    logger.info(f"Video is already web-compatible, skipping conversion: {azure_path.blob_path}")
+                else:
+                    logger.info(f"Conversion plan for {azure_path.blob_path}: {plan.value}")
+                    if plan == ConversionPlan.FULL:
+                        converted_success = self._convert_to_web_format(
+                            local_path, video_info, conversion_progress_callback
+                        )
+                    else:
+                        converted_success = self._remux_to_web_format(
+                            local_path, video_info, plan == ConversionPlan.AUDIO_ONLY, conversion_progress_callback
+                        )
+                    if not converted_success:
+                        self.repo.update_by_id(str(video.id), {"status": VideoStatus.DOWNLOAD_ERROR})
+                        cleanup_file(local_path)
+                        return {"status": "error", "message": "Помилка конвертації відео"}
+
+            # Індекс ключових кадрів фінального файлу - для нарізки кліпів і редактора без повторного ffprobe
+            get_keyframe_index(local_path)
+
+            if settings.proxy_rendition_enabled:
+                self._create_proxy_rendition(local_path, video_info)
 
             update_data = {
                 "status": VideoStatus.NOT_ANNOTATED,
@@ -98,6 +145,315 @@ class VideoProcessingService:
 
             return {"status": "error", "message": str(e)}
 
+    def _download_and_convert_pipelined(
+        self,
+        azure_path: AzureFilePath,
+        local_path: str,
+        download_progress_callback: Optional[Callable[[int, int], None]] = None,
+        conversion_progress_callback: Optional[Callable[[float], None]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Feed ffmpeg from the resumable .part file while the parallel download fills it
+
+        The download is the regular resumable one, so a retry skips chunks already
+        on disk and ffmpeg reads them straight from the file. Returns info of the
+        converted video (or None when the source is not worth pipelining or the
+        attempt failed) and whether the source ended up fully downloaded - the
+        sequential fallback then converts it without downloading again.
+        """
+        head_path = f"{local_path}.head"
+        converted_path = self._get_converted_path(local_path)
+        partial_path = get_partial_download_path(local_path)
+        process = None
+        download_thread = None
+
+        condition = threading.Condition()
+        download_state = {"contiguous": 0, "done": False, "success": False}
+
+        def on_contiguous(contiguous_bytes: int) -> None:
+            with condition:
+                download_state["contiguous"] = contiguous_bytes
+                condition.notify_all()
+
+        def run_download() -> None:
+            result = self.azure_service.download_video_to_local_with_progress(
+                azure_path, local_path, download_progress_callback, on_contiguous
+            )
+            with condition:
+                download_state["done"] = True
+                download_state["success"] = result["success"]
+                if result["success"]:
+                    download_state["contiguous"] = file_size
+                condition.notify_all()
+
+        def wait_for_bytes(target: int) -> int:
+            """Block until target bytes are on disk or the download ended; returns bytes available"""
+            with condition:
+                condition.wait_for(lambda: download_state["contiguous"] >= target or download_state["done"])
+                return download_state["contiguous"]
+
+        def finish_download() -> bool:
+            if download_thread:
+                download_thread.join()
+            return download_state["success"]
+
+        try:
+            _, properties = self.azure_service.get_blob_with_properties(azure_path)
+            file_size = properties.size
+            chunk_size = settings.azure_download_chunk_size
+
+            if file_size < chunk_size * 2:
+                return None, False
+
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            download_thread = threading.Thread(target=run_download, daemon=True)
+            download_thread.start()
+
+            if wait_for_bytes(chunk_size) < chunk_size:
+                return None, finish_download()
+
+            # Після завершення завантаження .part вже перейменовано на local_path
+            try:
+                source_file = open(partial_path, "rb")
+            except FileNotFoundError:
+                source_file = open(local_path, "rb")
+
+            with source_file:
+                # Аналізуємо лише перший фрагмент, щоб вирішити, чи можна конвертувати на льоту
+                with open(head_path, "wb") as head_file:
+                    head_file.write(os.pread(source_file.fileno(), chunk_size, 0))
+                head_info = self._get_video_info(head_path)
+                cleanup_file(head_path)
+
+                if not head_info or not head_info.get("video_codec"):
+                    logger.info(f"Source header is not streamable, using sequential flow: {azure_path.blob_path}")
+                    return None, finish_download()
+
+                # Ремукс і перекодування лише аудіо впираються в I/O, конвеєр потрібен тільки для повного кодування
+                if self._plan_conversion(head_info) != ConversionPlan.FULL:
+                    return None, finish_download()
+
+                command = ["ffmpeg", "-y", "-i", "pipe:0"]
+                command.extend(self._get_web_encode_args())
+                command.extend(["-progress", "pipe:1", "-loglevel", "error", converted_path])
+
+                logger.info(f"Starting pipelined download and conversion: {azure_path.blob_path}")
+                logger.debug(f"Pipelined conversion command: {' '.join(command)}")
+
+                # Тривалість з першого фрагмента ненадійна (TS/MKV без повного заголовка),
+                # тому прогрес рахуємо за байтами, які ffmpeg уже прочитав зі stdin
+                feed_state = {"fed_bytes": 0}
+
+                with tempfile.TemporaryFile() as stderr_file:
+                    process = subprocess.Popen(
+                        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=0
+                    )
+
+                    def read_progress() -> None:
+                        """Conversion progress is reported once the download part is over"""
+                        for line in iter(process.stdout.readline, b""):
+                            # Кожен блок -progress закінчується рядком progress=, використовуємо його як такт
+                            if not line.startswith(b"progress=") or not conversion_progress_callback:
+                                continue
+                            if not download_state["done"]:
+                                continue
+                            conversion_progress_callback(min(feed_state["fed_bytes"] / file_size * 100, 99))
+
+                    progress_thread = threading.Thread(target=read_progress, daemon=True)
+                    progress_thread.start()
+
+                    fed_bytes = 0
+                    try:
+                        while fed_bytes < file_size:
+                            available = wait_for_bytes(min(fed_bytes + PIPELINE_FEED_BLOCK_SIZE, file_size))
+                            if available <= fed_bytes:
+                                logger.error("Download stopped before the whole blob was streamed to FFmpeg")
+                                break
+                            block = os.pread(
+                                source_file.fileno(), min(available - fed_bytes, PIPELINE_FEED_BLOCK_SIZE), fed_bytes
+                            )
+                            process.stdin.write(block)
+                            fed_bytes += len(block)
+                            feed_state["fed_bytes"] = fed_bytes
+
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        logger.error("FFmpeg closed its input before the whole blob was streamed")
+
+                    process.wait()
+                    progress_thread.join()
+
+                    stderr_file.seek(0)
+                    stderr_output = stderr_file.read().decode(errors="replace")
+
+            # Завантаження доводимо до кінця навіть при збої конвеєра - байти не втрачаються
+            downloaded = finish_download()
+
+            if (process.returncode != 0 or fed_bytes != file_size
+                    or not os.path.exists(converted_path) or os.path.getsize(converted_path) == 0):
+                logger.error(f"Pipelined conversion failed, falling back to sequential flow: {stderr_output}")
+                cleanup_file(converted_path)
+                return None, downloaded
+
+            if conversion_progress_callback:
+                conversion_progress_callback(100)
+
+            os.replace(converted_path, local_path)
+
+            video_info = self._get_video_info(local_path)
+            if not video_info:
+                cleanup_file(local_path)
+                return None, False
+
+            logger.info(f"Video downloaded and converted in a single pass: {azure_path.blob_path}")
+            return video_info, True
+
+        except Exception as e:
+            logger.error(f"Pipelined conversion error for {azure_path.blob_path}: {str(e)}")
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+            cleanup_file(head_path)
+            cleanup_file(converted_path)
+            return None, finish_download()
+
+    def package_hls(self, azure_path: AzureFilePath) -> Dict[str, Any]:
+        """Package the editor rendition into an HLS playlist with short fMP4 segments
+
+        Streams are copied, not re-encoded, so segment boundaries follow the
+        source keyframes. The proxy rendition is packaged when it exists since
+        that is what the editor plays by default.
+        """
+        filename = extract_filename_from_azure_path(azure_path)
+        local_path = get_local_video_path(filename)
+        proxy_path = get_local_proxy_path(filename)
+        source_path = proxy_path if os.path.exists(proxy_path) else local_path
+
+        if not os.path.exists(source_path):
+            return {"status": "error", "message": "Локальний файл не знайдено"}
+
+        hls_dir = get_local_hls_dir(filename)
+        partial_dir = f"{hls_dir}.part"
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        os.makedirs(partial_dir)
+
+        try:
+            command = [
+                "ffmpeg", "-y", "-i", source_path,
+                "-map", "0:v:0", "-map", "0:a:0?",
+                "-c", "copy",
+                "-f", "hls",
+                "-hls_time", str(settings.hls_segment_duration_sec),
+                "-hls_playlist_type", "vod",
+                "-hls_segment_type", "fmp4",
+                "-hls_fmp4_init_filename", HLS_INIT_NAME,
+                "-hls_segment_filename", os.path.join(partial_dir, HLS_SEGMENT_PATTERN),
+                "-loglevel", "error",
+                os.path.join(partial_dir, HLS_PLAYLIST_NAME)
+            ]
+
+            logger.debug(f"HLS packaging command: {' '.join(command)}")
+
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0 or not os.path.exists(os.path.join(partial_dir, HLS_PLAYLIST_NAME)):
+                logger.error(f"HLS packaging failed for {azure_path.blob_path}: {result.stderr}")
+                return {"status": "error", "message": "Помилка пакування HLS"}
+
+            # Підміняємо директорію цілком, щоб плеєр не побачив напівзаписаний плейлист
+            shutil.rmtree(hls_dir, ignore_errors=True)
+            os.rename(partial_dir, hls_dir)
+
+            segment_count = sum(1 for name in os.listdir(hls_dir) if name.endswith(".m4s"))
+            logger.info(f"HLS packaged with {segment_count} segments: {azure_path.blob_path}")
+            return {"status": "success", "segments": segment_count}
+
+        except Exception as e:
+            logger.error(f"Error packaging HLS for {azure_path.blob_path}: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        finally:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+
+    def generate_thumbnail_sprites(self, azure_path: AzureFilePath) -> Dict[str, Any]:
+        """Extract evenly spaced thumbnails into JPEG sprite sheets with a JSON and WebVTT index
+
+        One ffmpeg pass: the fps filter samples frames, scale shrinks them and
+        tile packs columns x rows thumbnails per sheet.
+        """
+        filename = extract_filename_from_azure_path(azure_path)
+        local_path = get_local_video_path(filename)
+        proxy_path = get_local_proxy_path(filename)
+        source_path = proxy_path if os.path.exists(proxy_path) else local_path
+
+        video_info = self._get_video_info(source_path) if os.path.exists(source_path) else None
+        if not video_info or not video_info.get("width") or not video_info.get("duration"):
+            return {"status": "error", "message": "Не вдалося проаналізувати відео"}
+
+        duration = video_info["duration"]
+        interval = max(settings.thumbnail_interval_sec, duration / settings.thumbnail_max_count)
+        width = settings.thumbnail_width
+        height = max(2, round(width * video_info["height"] / video_info["width"] / 2) * 2)
+        columns, rows = settings.thumbnail_sprite_columns, settings.thumbnail_sprite_rows
+
+        thumbnails_dir = get_local_thumbnails_dir(filename)
+        partial_dir = f"{thumbnails_dir}.part"
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        os.makedirs(partial_dir)
+
+        try:
+            command = [
+                "ffmpeg", "-y", "-i", source_path,
+                "-an", "-sn",
+                "-vf", f"fps=1/{interval:.3f},scale={width}:{height},tile={columns}x{rows}",
+                "-q:v", "5",
+                "-loglevel", "error",
+                os.path.join(partial_dir, THUMBNAIL_SPRITE_PATTERN)
+            ]
+
+            logger.debug(f"Thumbnail sprites command: {' '.join(command)}")
+
+            result = subprocess.run(command, capture_output=True, text=True)
+            sheets = sorted(name for name in os.listdir(partial_dir) if name.endswith(".jpg"))
+            if result.returncode != 0 or not sheets:
+                logger.error(f"Thumbnail sprite generation failed for {azure_path.blob_path}: {result.stderr}")
+                return {"status": "error", "message": "Помилка генерації прев'ю"}
+
+            per_sheet = columns * rows
+            count = min(int(duration // interval) + 1, len(sheets) * per_sheet)
+
+            index = {
+                "interval": interval,
+                "width": width,
+                "height": height,
+                "columns": columns,
+                "rows": rows,
+                "count": count,
+                "sheets": sheets
+            }
+            with open(os.path.join(partial_dir, THUMBNAILS_INDEX_NAME), "w", encoding="utf-8") as index_file:
+                json.dump(index, index_file)
+
+            with open(os.path.join(partial_dir, THUMBNAILS_VTT_NAME), "w", encoding="utf-8") as vtt_file:
+                vtt_file.write("WEBVTT\n\n")
+                for i in range(count):
+                    start = i * interval
+                    end = min(start + interval, duration)
+                    column, row = (i % per_sheet) % columns, (i % per_sheet) // columns
+                    vtt_file.write(
+                        f"{format_vtt_timestamp(start)} --> {format_vtt_timestamp(end)}\n"
+                        f"{sheets[i // per_sheet]}#xywh={column * width},{row * height},{width},{height}\n\n"
+                    )
+
+            shutil.rmtree(thumbnails_dir, ignore_errors=True)
+            os.rename(partial_dir, thumbnails_dir)
+
+            logger.info(f"Generated {count} thumbnails in {len(sheets)} sprite sheets: {azure_path.blob_path}")
+            return {"status": "success", "thumbnails": count, "sheets": len(sheets)}
+
+        except Exception as e:
+            logger.error(f"Error generating thumbnail sprites for {azure_path.blob_path}: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        finally:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+
     def _get_video_info(self, video_path: str) -> Optional[Dict[str, Any]]:
         """Get detailed video information"""
         cmd = [
@@ -133,6 +489,7 @@ class VideoProcessingService:
                 "fps": eval(video_stream.get("r_frame_rate", "0/1")) if video_stream else 0,
                 "video_codec": video_stream.get("codec_name", "") if video_stream else "",
                 "video_profile": video_stream.get("profile", "") if video_stream else "",
+                "pix_fmt": video_stream.get("pix_fmt", "") if video_stream else "",
                 "audio_codec": audio_stream.get("codec_name", "") if audio_stream else "",
             }
 
@@ -140,17 +497,254 @@ class VideoProcessingService:
             logger.error(f"Error getting video info {video_path}: {str(e)}")
             return None
 
-    def _is_web_compatible(self, video_info: Dict[str, Any]) -> bool:
-        """Check if video is already web-compatible"""
+    @staticmethod
+    def _plan_conversion(video_info: Dict[str, Any]) -> ConversionPlan:
+        """Pick the cheapest conversion that makes the video web-compatible"""
+        if not settings.skip_conversion_for_compatible:
+            return ConversionPlan.FULL
+
         video_codec = video_info.get("video_codec", "").lower()
         audio_codec = video_info.get("audio_codec", "").lower()
         container = video_info.get("container", "").lower()
+        pix_fmt = video_info.get("pix_fmt", "").lower()
 
-        is_h264 = "h264" in video_codec or "avc" in video_codec
-        is_aac_audio = "aac" in audio_codec
+        is_h264 = ("h264" in video_codec or "avc" in video_codec) and pix_fmt in ("", "yuv420p", "yuvj420p")
+        is_aac_audio = not audio_codec or "aac" in audio_codec
         is_mp4_container = container in ["mp4", "mov"]
 
-        return is_h264 and is_aac_audio and is_mp4_container
+        if not is_h264:
+            return ConversionPlan.FULL
+        if not is_aac_audio:
+            return ConversionPlan.AUDIO_ONLY
+        if not is_mp4_container:
+            return ConversionPlan.REMUX
+        return ConversionPlan.NONE
+
+    @staticmethod
+    def _get_converted_path(local_path: str) -> str:
+        """Path for the web-converted copy of a local video"""
+        name_without_ext = os.path.splitext(os.path.basename(local_path))[0]
+        return get_local_video_path(f"{name_without_ext}_web.mp4")
+
+    @staticmethod
+    def _get_video_encode_args() -> List[str]:
+        """FFmpeg arguments for the web-compatible H.264 video stream"""
+        return [
+            "-c:v", "libx264",
+            "-preset", settings.video_conversion_preset,
+            "-crf", str(settings.video_conversion_crf),
+            "-profile:v", "high",
+            "-level", "4.0",
+            "-pix_fmt", "yuv420p"
+        ]
+
+    @staticmethod
+    def _get_audio_encode_args() -> List[str]:
+        """FFmpeg arguments for the web-compatible AAC audio stream"""
+        return ["-c:a", "aac", "-b:a", "128k"]
+
+    def _get_web_encode_args(self) -> List[str]:
+        """FFmpeg output arguments for the web-compatible H.264/AAC encode"""
+        return [
+            *self._get_video_encode_args(),
+            *self._get_audio_encode_args(),
+            "-movflags", "+faststart",
+            "-f", "mp4"
+        ]
+
+    @staticmethod
+    def _get_proxy_encode_args(video_info: Dict[str, Any]) -> List[str]:
+        """FFmpeg output arguments for the low-resolution annotation proxy"""
+        fps = video_info.get("fps") or 25
+        gop = max(1, round(fps * settings.proxy_rendition_keyframe_interval_sec))
+        return [
+            "-vf", f"scale=-2:{settings.proxy_rendition_height}",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-crf", str(settings.proxy_rendition_crf),
+            "-maxrate", settings.proxy_rendition_maxrate,
+            "-bufsize", settings.proxy_rendition_maxrate,
+            "-g", str(gop),
+            "-keyint_min", str(gop),
+            "-sc_threshold", "0",
+            "-profile:v", "main",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "64k",
+            "-movflags", "+faststart",
+            "-f", "mp4"
+        ]
+
+    def _create_proxy_rendition(self, local_path: str, video_info: Dict[str, Any]) -> bool:
+        """Encode a small, seek-friendly copy for the editor; the original stays the clip source
+
+        Sources that are already at or below the proxy height are served as-is,
+        so no proxy is produced for them. Failure is not fatal: the stream
+        endpoint falls back to the original file.
+        """
+        if video_info.get("height", 0) <= settings.proxy_rendition_height:
+            return False
+
+        proxy_path = get_local_proxy_path(os.path.basename(local_path))
+        partial_path = f"{proxy_path}.part"
+
+        try:
+            command = ["ffmpeg", "-y", "-i", local_path, "-map", "0:v:0", "-map", "0:a:0?"]
+            command.extend(self._get_proxy_encode_args(video_info))
+            command.extend(["-loglevel", "error", partial_path])
+
+            logger.debug(f"Proxy rendition command: {' '.join(command)}")
+
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0 or not os.path.exists(partial_path) or os.path.getsize(partial_path) == 0:
+                logger.error(f"Proxy rendition failed, editor will stream the original: {result.stderr}")
+                cleanup_file(partial_path)
+                return False
+
+            os.replace(partial_path, proxy_path)
+            logger.info(f"Proxy rendition created: {proxy_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error creating proxy rendition for {local_path}: {str(e)}")
+            cleanup_file(partial_path)
+            return False
+
+    def _plan_segments(self, local_path: str, duration: float) -> Optional[List[Tuple[float, float]]]:
+        """Split video into GOP-aligned (start, end) ranges for parallel encoding"""
+        keyframes = get_keyframe_index(local_path)
+        if not keyframes:
+            return None
+
+        segment_count = settings.segment_parallel_workers
+        boundaries = [0.0]
+
+        for i in range(1, segment_count):
+            target = duration * i / segment_count
+            position = bisect.bisect_left(keyframes, target)
+            if position >= len(keyframes):
+                break
+            keyframe = keyframes[position]
+            if boundaries[-1] < keyframe < duration:
+                boundaries.append(keyframe)
+
+        if len(boundaries) < 2:
+            return None
+
+        boundaries.append(duration)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def _convert_to_web_format_segmented(
+            self,
+            local_path: str,
+            video_info: Dict[str, Any],
+            segments: List[Tuple[float, float]],
+            progress_callback: Optional[Callable[[float], None]] = None
+    ) -> bool:
+        """Encode GOP-aligned segments in parallel and concat them losslessly"""
+        work_dir = tempfile.mkdtemp(prefix="segments_", dir=settings.temp_folder)
+
+        try:
+            duration = video_info.get("duration", 0)
+            has_audio = bool(video_info.get("audio_codec"))
+            threads_per_segment = max(1, (os.cpu_count() or 1) // len(segments))
+
+            progress_lock = threading.Lock()
+            segment_progress = [0.0] * len(segments)
+
+            def report_progress(segment_index: int, seconds_done: float) -> None:
+                """Aggregate per-segment progress into one percentage"""
+                with progress_lock:
+                    segment_progress[segment_index] = seconds_done
+                    if progress_callback and duration > 0:
+                        progress_callback(min(sum(segment_progress) / duration * 100, 99))
+
+            def encode_segment(segment_index: int) -> Optional[str]:
+                """Encode a single video-only segment"""
+                start, end = segments[segment_index]
+                segment_path = os.path.join(work_dir, f"segment_{segment_index:03d}.mp4")
+
+                command = ["ffmpeg", "-y", "-ss", f"{start:.3f}", "-i", local_path]
+                if segment_index < len(segments) - 1:
+                    command.extend(["-t", f"{end - start:.3f}"])
+                command.extend(["-map", "0:v:0", "-an"])
+                command.extend(self._get_video_encode_args())
+                command.extend([
+                    "-threads", str(threads_per_segment),
+                    "-f", "mp4",
+                    "-progress", "pipe:1",
+                    "-loglevel", "error",
+                    segment_path
+                ])
+
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                for line in process.stdout:
+                    if line.startswith("out_time_ms="):
+                        try:
+                            report_progress(segment_index, int(line.split("=")[1]) / 1000000)
+                        except (ValueError, IndexError):
+                            continue
+                stderr_output = process.stderr.read()
+                process.wait()
+
+                if process.returncode != 0 or not os.path.exists(segment_path):
+                    logger.error(f"Segment {segment_index} encoding failed: {stderr_output}")
+                    return None
+
+                report_progress(segment_index, end - start)
+                return segment_path
+
+            def encode_audio() -> Optional[str]:
+                """Encode the whole audio track in one pass to avoid gaps at segment joins"""
+                audio_path = os.path.join(work_dir, "audio.m4a")
+                command = ["ffmpeg", "-y", "-i", local_path, "-map", "0:a:0", "-vn"]
+                command.extend(self._get_audio_encode_args())
+                command.extend(["-f", "mp4", "-loglevel", "error", audio_path])
+
+                result = subprocess.run(command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    logger.error(f"Audio encoding failed: {result.stderr}")
+                    return None
+                return audio_path
+
+            logger.info(f"Encoding {len(segments)} segments in parallel: {local_path}")
+
+            with ThreadPoolExecutor(max_workers=len(segments) + 1) as executor:
+                audio_future = executor.submit(encode_audio) if has_audio else None
+                segment_paths = list(executor.map(encode_segment, range(len(segments))))
+                audio_path = audio_future.result() if audio_future else None
+
+            if not all(segment_paths) or (has_audio and not audio_path):
+                return False
+
+            concat_list_path = os.path.join(work_dir, "segments.txt")
+            with open(concat_list_path, "w", encoding="utf-8") as concat_list:
+                for segment_path in segment_paths:
+                    concat_list.write(f"file '{os.path.abspath(segment_path)}'\n")
+
+            converted_path = self._get_converted_path(local_path)
+            command = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list_path]
+            if audio_path:
+                command.extend(["-i", audio_path, "-map", "0:v", "-map", "1:a"])
+            command.extend(["-c", "copy", "-movflags", "+faststart", "-f", "mp4", "-loglevel", "error", converted_path])
+
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0 or not os.path.exists(converted_path) or os.path.getsize(converted_path) == 0:
+                logger.error(f"Segment concat failed: {result.stderr}")
+                cleanup_file(converted_path)
+                return False
+
+            if progress_callback:
+                progress_callback(100)
+            cleanup_file(local_path)
+            os.rename(converted_path, local_path)
+            logger.info(f"Video successfully converted with {len(segments)} parallel segments")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in segmented conversion: {str(e)}")
+            return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
     def _convert_to_web_format(
             self,
@@ -160,26 +754,20 @@ class VideoProcessingService:
     ) -> bool:
         """Convert video to web format using CPU only"""
         try:
-            filename = os.path.basename(local_path)
-            name_without_ext = os.path.splitext(filename)[0]
-            converted_filename = f"{name_without_ext}_web.mp4"
-            converted_path = get_local_video_path(converted_filename)
-
             duration = video_info.get("duration", 0)
 
-            command = ["ffmpeg", "-y", "-i", local_path]
+            if settings.segment_parallel_workers > 1 and duration >= settings.segment_parallel_min_duration_sec:
+                segments = self._plan_segments(local_path, duration)
+                if segments and self._convert_to_web_format_segmented(
+                        local_path, video_info, segments, progress_callback):
+                    return True
+                logger.info("Segmented conversion unavailable, using single-process conversion")
 
+            converted_path = self._get_converted_path(local_path)
+
+            command = ["ffmpeg", "-y", "-i", local_path]
+            command.extend(self._get_web_encode_args())
             command.extend([
-                "-c:v", "libx264",
-                "-preset", settings.video_conversion_preset,
-                "-crf", str(settings.video_conversion_crf),
-                "-profile:v", "high",
-                "-level", "4.0",
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-movflags", "+faststart",
-                "-pix_fmt", "yuv420p",
-                "-f", "mp4",
                 "-progress", "pipe:1",
                 "-loglevel", "error",
                 converted_path
@@ -188,26 +776,9 @@ class VideoProcessingService:
             logger.debug(f"Conversion command: {' '.join(command)}")
             logger.info("Using CPU for video conversion")
 
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            returncode, stderr_output = self._run_ffmpeg_with_progress(command, duration, progress_callback)
 
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-
-                if line.startswith("out_time_ms=") and progress_callback:
-                    try:
-                        time_ms = int(line.split("=")[1])
-                        time_seconds = time_ms / 1000000
-                        if duration > 0:
-                            progress_percent = min((time_seconds / duration) * 100, 100)
-                            progress_callback(progress_percent)
-                    except (ValueError, IndexError):
-                        continue
-
-            process.wait()
-
-            if process.returncode == 0 and os.path.exists(converted_path) and os.path.getsize(converted_path) > 0:
+            if returncode == 0 and os.path.exists(converted_path) and os.path.getsize(converted_path) > 0:
                 if progress_callback:
                     progress_callback(100)
                 cleanup_file(local_path)
@@ -215,10 +786,80 @@ class VideoProcessingService:
                 logger.info("Video successfully converted using CPU")
                 return True
             else:
-                stderr_output = process.stderr.read() if process.stderr else ""
                 logger.error(f"FFmpeg conversion error: {stderr_output}")
                 return False
 
         except Exception as e:
             logger.error(f"Error converting video: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def _remux_to_web_format(
+            self,
+            local_path: str,
+            video_info: Dict[str, Any],
+            transcode_audio: bool,
+            progress_callback: Optional[Callable[[float], None]] = None
+    ) -> bool:
+        """Copy the H.264 stream into MP4, re-encoding only the audio when needed"""
+        try:
+            converted_path = self._get_converted_path(local_path)
+            duration = video_info.get("duration", 0)
+
+            command = ["ffmpeg", "-y", "-i", local_path, "-map", "0:v:0", "-map", "0:a:0?", "-c:v", "copy"]
+            command.extend(self._get_audio_encode_args() if transcode_audio else ["-c:a", "copy"])
+            command.extend([
+                "-avoid_negative_ts", "make_zero",
+                "-movflags", "+faststart",
+                "-f", "mp4",
+                "-progress", "pipe:1",
+                "-loglevel", "error",
+                converted_path
+            ])
+
+            logger.debug(f"Remux command: {' '.join(command)}")
+
+            returncode, stderr_output = self._run_ffmpeg_with_progress(command, duration, progress_callback)
+
+            if returncode == 0 and os.path.exists(converted_path) and os.path.getsize(converted_path) > 0:
+                if progress_callback:
+                    progress_callback(100)
+                cleanup_file(local_path)
+                os.rename(converted_path, local_path)
+                logger.info(f"Video successfully remuxed ({'audio transcoded' if transcode_audio else 'stream copy'})")
+                return True
+
+            logger.error(f"FFmpeg remux error, falling back to full conversion: {stderr_output}")
+            cleanup_file(converted_path)
+            return self._convert_to_web_format(local_path, video_info, progress_callback)
+
+        except Exception as e:
+            logger.error(f"Error remuxing video: {str(e)}")
+            return False
+
+    @staticmethod
+    def _run_ffmpeg_with_progress(
+            command: List[str],
+            duration: float,
+            progress_callback: Optional[Callable[[float], None]] = None
+    ) -> Tuple[int, str]:
+        """Run ffmpeg with -progress pipe:1 and report percentage of duration processed"""
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                break
+
+            if line.startswith("out_time_ms=") and progress_callback:
+                try:
+                    time_ms = int(line.split("=")[1])
+                    time_seconds = time_ms / 1000000
+                    if duration > 0:
+                        progress_percent = min((time_seconds / duration) * 100, 100)
+                        progress_callback(progress_percent)
+                except (ValueError, IndexError):
+                    continue
+
+        process.wait()
+        stderr_output = process.stderr.read() if process.stderr else ""
+        return process.returncode, stderr_output
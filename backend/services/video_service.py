@@ -1,4 +1,6 @@
 import os
+import re
+import json
 import math
 from typing import Dict, Any, Optional, List
 
@@ -16,15 +18,27 @@ from backend.models.api import (
     LockVideoResponse, VideoInfoResponse, PaginationInfo
 )
 from backend.api.exceptions import (
-    VideoNotFoundException, VideoNotReadyException,
-    BusinessLogicException, AuthenticationException
+    VideoNotFoundException, VideoNotReadyException, NotFoundException,
+    BusinessLogicException, AuthenticationException, ConflictException, InvalidTokenException
 )
 from backend.utils.azure_path_utils import extract_filename_from_azure_path
-from backend.utils.video_utils import get_local_video_path
+from backend.utils.video_utils import (
+    get_local_video_path, get_proxy_filename, get_file_cache_validators,
+    get_hls_dirname, get_local_hls_dir, HLS_PLAYLIST_NAME, HLS_INIT_NAME,
+    get_thumbnails_dirname, get_local_thumbnails_dir, THUMBNAILS_INDEX_NAME,
+    get_keyframe_index, encode_keyframe_deltas
+)
+from backend.utils.signed_urls import get_signed_url_expiry, sign_resource, verify_resource_signature
+from backend.config.settings import get_settings
 from backend.utils.logger import get_logger
 
+settings = get_settings()
 logger = get_logger(__name__, "services.log")
 
+# Дозволені імена файлів у директоріях похідних файлів (захист від обходу шляхів)
+HLS_MEDIA_NAME_PATTERN = re.compile(r"^(init\.mp4|segment_\d{5}\.m4s)$")
+THUMBNAIL_FILE_NAME_PATTERN = re.compile(r"^(sprite_\d{3}\.jpg|thumbnails\.vtt)$")
+
 
 class VideoService:
     """Сервіс для операцій з відео"""
@@ -138,9 +152,14 @@ class VideoService:
         }
         return status_messages.get(status, str(status))
 
-    def register_multiple_videos(self, video_urls: List[str]) -> VideoUploadResponse:
+    def register_multiple_videos(self, video_urls: List[str],
+                                 validation_results: Optional[Dict[str, Dict[str, Any]]] = None) -> VideoUploadResponse:
         """Реєстрація кількох відео з URLs"""
         try:
+            # Перевірка в Azure виконується паралельно, якщо результати не передані (напр. з лістингу папки)
+            if validation_results is None:
+                validation_results = self.azure_service.batch_validate_urls(video_urls)
+
             processing_results = {
                 "new_videos": [],
                 "existing_ready": [],
@@ -148,107 +167,133 @@ class VideoService:
                 "errors": []
             }
 
+            valid_videos = {}
+            blob_urls = {}
             for url in video_urls:
-                try:
-                    validation_result = self.azure_service.validate_azure_url(url)
-
-                    if not validation_result["valid"]:
-                        processing_results["errors"].append({
-                            "url": url,
-                            "error": validation_result['error']
-                        })
-                        continue
-
-                    azure_path = validation_result["azure_path"]
-                    filename = validation_result["filename"]
-                    size_bytes = validation_result["size_bytes"]
-
-                    # Проверяем существование в БД
-                    existing_video = self.source_repo.get_by_field("azure_file_path.blob_path", azure_path.blob_path)
-
-                    if existing_video:
-                        local_path = get_local_video_path(filename)
-
-                        # Видео есть в БД и локально
-                        if os.path.exists(local_path):
-                            # Проверяем статус - готово ли для работы
-                            if existing_video.status in [VideoStatus.NOT_ANNOTATED, VideoStatus.IN_PROGRESS]:
-                                processing_results["existing_ready"].append({
-                                    "filename": filename,
-                                    "status": existing_video.status,
-                                    "local_exists": True,
-                                    "message": "Готове для анотації"
-                                })
-                            else:
-                                processing_results["existing_ready"].append({
-                                    "filename": filename,
-                                    "status": existing_video.status,
-                                    "local_exists": True,
-                                    "message": f"Статус: {existing_video.status}"
-                                })
-                            continue
-                        else:
-                            # Видео есть в БД но отсутствует локально - перезагружаем
-                            logger.info(f"Відео {filename} є в БД але відсутнє локально. Перезавантажуємо.")
-                            
-                            # Обновляем статус на downloading
-                            self.source_repo.update_by_id(
-                                str(existing_video.id),
-                                {"status": VideoStatus.DOWNLOADING}
-                            )
-
-                            from backend.background_tasks.tasks.video_download_conversion import \
-                                download_and_convert_video
-                            task = download_and_convert_video.apply_async(
-                                args=[azure_path.model_dump()],
-                                priority=5
-                            )
-
-                            processing_results["redownloading"].append({
-                                "filename": filename,
-                                "task_id": task.id,
-                                "local_exists": False,
-                                "message": "Відсутнє локально, перезавантажується"
-                            })
-                            continue
-
-                    # Видео не существует в БД - создаем новое
-                    azure_file_path_doc = AzureFilePathDocument(
-                        account_name=azure_path.account_name,
-                        container_name=azure_path.container_name,
-                        blob_path=azure_path.blob_path
-                    )
+                validation_result = validation_results[url]
 
-                    video_document = self.source_repo.create(
-                        azure_file_path=azure_file_path_doc,
-                        status=VideoStatus.DOWNLOADING,
-                        size_MB=round(size_bytes / (1024 * 1024), 2) if size_bytes else None
-                    )
+                if not validation_result["valid"]:
+                    processing_results["errors"].append({
+                        "url": url,
+                        "error": validation_result['error']
+                    })
+                    continue
+
+                # Дублікати в одному запиті реєструємо один раз
+                blob_path = validation_result["azure_path"].blob_path
+                valid_videos.setdefault(blob_path, validation_result)
+                blob_urls.setdefault(blob_path, url)
+
+            # Один запит $in замість пошуку кожного відео окремо
+            existing_videos = {
+                video.azure_file_path.blob_path: video
+                for video in self.source_repo.get_all({"azure_file_path.blob_path__in": list(valid_videos)})
+            } if valid_videos else {}
+
+            redownload_videos = []
+            new_video_documents = []
+
+            for blob_path, validation_result in valid_videos.items():
+                filename = validation_result["filename"]
+                existing_video = existing_videos.get(blob_path)
+
+                if not existing_video:
+                    new_video_documents.append({
+                        "azure_file_path": AzureFilePathDocument(
+                            account_name=validation_result["azure_path"].account_name,
+                            container_name=validation_result["azure_path"].container_name,
+                            blob_path=blob_path
+                        ),
+                        "status": VideoStatus.DOWNLOADING,
+                        "size_MB": round(validation_result["size_bytes"] / (1024 * 1024), 2)
+                        if validation_result["size_bytes"] else None
+                    })
+                    continue
 
-                    from backend.background_tasks.tasks.video_download_conversion import download_and_convert_video
-                    task = download_and_convert_video.apply_async(
-                        args=[azure_path.model_dump()],
-                        priority=5
-                    )
+                # Відео є в БД і локально
+                if os.path.exists(get_local_video_path(filename)):
+                    if existing_video.status in [VideoStatus.NOT_ANNOTATED, VideoStatus.IN_PROGRESS]:
+                        message = "Готове для анотації"
+                    else:
+                        message = f"Статус: {existing_video.status}"
 
-                    processing_results["new_videos"].append({
+                    processing_results["existing_ready"].append({
                         "filename": filename,
-                        "task_id": task.id,
-                        "video_id": str(video_document.id),
-                        "message": "Нове відео додано в чергу завантаження"
+                        "status": existing_video.status,
+                        "local_exists": True,
+                        "message": message
                     })
+                else:
+                    # Відео є в БД але відсутнє локально - перезавантажуємо
+                    logger.info(f"Відео {filename} є в БД але відсутнє локально. Перезавантажуємо.")
+                    redownload_videos.append((existing_video, validation_result))
 
-                except BusinessLogicException as e:
-                    processing_results["errors"].append({
-                        "url": url,
-                        "error": str(e)
-                    })
+            created_videos = []
+            if new_video_documents:
+                try:
+                    created_videos = self.source_repo.bulk_create(new_video_documents)
                 except Exception as e:
-                    logger.error(f"Помилка обробки відео {url}: {str(e)}")
+                    logger.error(f"Помилка створення записів відео: {str(e)}")
+                    # Впорядкована вставка лишає записи до місця збою - без завдання вони застрягли б у DOWNLOADING
+                    self.source_repo.update_many(
+                        {
+                            "azure_file_path.blob_path__in": [
+                                document["azure_file_path"].blob_path for document in new_video_documents
+                            ],
+                            "status": VideoStatus.DOWNLOADING
+                        },
+                        {"status": VideoStatus.DOWNLOAD_ERROR}
+                    )
+                    for document in new_video_documents:
+                        processing_results["errors"].append({
+                            "url": blob_urls[document["azure_file_path"].blob_path],
+                            "error": f"Помилка створення запису: {str(e)}"
+                        })
+
+            if redownload_videos:
+                self.source_repo.update_many(
+                    {"id__in": [video.id for video, _ in redownload_videos]},
+                    {"status": VideoStatus.DOWNLOADING}
+                )
+
+            # Публікуємо всі завдання завантаження однією групою через одне з'єднання з брокером
+            to_enqueue = [result for _, result in redownload_videos] + [
+                valid_videos[video.azure_file_path.blob_path] for video in created_videos
+            ]
+            try:
+                task_ids = self._enqueue_download_tasks([result["azure_path"] for result in to_enqueue])
+            except Exception as e:
+                # Статус DOWNLOADING без завдання в черзі назавжди заблокував би відео
+                logger.error(f"Помилка публікації завдань завантаження: {str(e)}")
+                for video, _ in redownload_videos:
+                    self.source_repo.update_by_id(str(video.id), {"status": video.status})
+                if created_videos:
+                    self.source_repo.update_many(
+                        {"id__in": [video.id for video in created_videos]},
+                        {"status": VideoStatus.DOWNLOAD_ERROR}
+                    )
+                for result in to_enqueue:
                     processing_results["errors"].append({
-                        "url": url,
-                        "error": f"Помилка обробки: {str(e)}"
+                        "url": blob_urls[result["azure_path"].blob_path],
+                        "error": f"Не вдалося додати в чергу завантаження: {str(e)}"
                     })
+                redownload_videos, created_videos, task_ids = [], [], []
+
+            for (video, validation_result), task_id in zip(redownload_videos, task_ids):
+                processing_results["redownloading"].append({
+                    "filename": validation_result["filename"],
+                    "task_id": task_id,
+                    "local_exists": False,
+                    "message": "Відсутнє локально, перезавантажується"
+                })
+
+            for video, task_id in zip(created_videos, task_ids[len(redownload_videos):]):
+                processing_results["new_videos"].append({
+                    "filename": valid_videos[video.azure_file_path.blob_path]["filename"],
+                    "task_id": task_id,
+                    "video_id": str(video.id),
+                    "message": "Нове відео додано в чергу завантаження"
+                })
 
             # Формируем успешные результаты для создания прогресс-баров
             successful_tasks = []
@@ -292,6 +337,22 @@ class VideoService:
             logger.error(f"Помилка пакетної реєстрації відео: {str(e)}")
             raise BusinessLogicException(f"Помилка пакетної реєстрації відео: {str(e)}")
 
+    @staticmethod
+    def _enqueue_download_tasks(azure_paths: List[AzureFilePath]) -> List[str]:
+        """Публікація завдань завантаження однією групою Celery"""
+        if not azure_paths:
+            return []
+
+        from celery import group
+        from backend.background_tasks.tasks.video_download_conversion import download_and_convert_video
+
+        group_result = group(
+            download_and_convert_video.s(azure_path.model_dump()) for azure_path in azure_paths
+        ).apply_async(priority=5)
+
+        logger.info(f"Додано в чергу {len(azure_paths)} завдань завантаження")
+        return [result.id for result in group_result.results]
+
     def register_videos_from_folder(self, folder_url: str) -> VideoUploadResponse:
         """Реєстрація всіх відео з Azure папки"""
         try:
@@ -303,8 +364,9 @@ class VideoService:
             # Извлекаем URLs видео
             video_urls = [video_info["url"] for video_info in videos_in_folder]
             
-            # Используем улучшенную логику обработки множественных видео
-            result = self.register_multiple_videos(video_urls)
+            # Розміри вже отримані з лістингу папки - повторно Azure не опитуємо
+            validation_results = self.azure_service.validate_listed_videos(videos_in_folder)
+            result = self.register_multiple_videos(video_urls, validation_results)
             
             # Обновляем сообщение для папки
             folder_name = folder_url.split('/')[-1] or folder_url.split('/')[-2]
@@ -410,18 +472,17 @@ class VideoService:
                 VideoStatus.PROCESSING_CLIPS,  # Відео в процесі обробки кліпів
                 VideoStatus.ANNOTATED  # Анотовані відео також показуємо
             ]
-            all_videos = [v for v in self.source_repo.get_all() if v.status in valid_statuses]
-
-            all_videos.sort(key=lambda x: x.created_at_utc, reverse=True)
-
-            total_count = len(all_videos)
+            videos_for_page, total_count = self.source_repo.get_page(
+                {"status__in": valid_statuses},
+                order_by=["-created_at_utc"],
+                page=page,
+                per_page=per_page
+            )
             total_pages = math.ceil(total_count / per_page) if total_count > 0 else 1
 
-            offset = (page - 1) * per_page
-            videos_for_page = all_videos[offset:offset + per_page]
-
             video_ids = [str(video.id) for video in videos_for_page]
             lock_statuses = self.lock_service.get_all_video_locks(video_ids)
+            clips_metadata = self._get_first_clip_metadata(video_ids)
 
             processed_videos = []
             for video in videos_for_page:
@@ -431,13 +492,14 @@ class VideoService:
                 # Синхронізація статусу: якщо відео має статус IN_PROGRESS, але не заблоковане - виправляємо
                 if video.status == VideoStatus.IN_PROGRESS and not lock_status.get("locked"):
                     logger.info(f"Synchronizing status for video {video_id}: IN_PROGRESS -> NOT_ANNOTATED (lock expired)")
-                    self.source_repo.update_by_id(video_id, {"status": VideoStatus.NOT_ANNOTATED})
+                    self.source_repo.update_by_id(
+                        video_id, {"status": VideoStatus.NOT_ANNOTATED}, expected_status=VideoStatus.IN_PROGRESS
+                    )
                     video.status = VideoStatus.NOT_ANNOTATED
                     
                 can_start_work = self._can_user_start_work(video, lock_status, user_id)
 
-                first_clip_data = self.clip_repo.get_all({"source_video_id": video_id}, limit=1)
-                metadata = first_clip_data[0] if first_clip_data else None
+                metadata = clips_metadata.get(video_id, {})
 
                 video_info = VideoInfoResponse(
                     id=video_id,
@@ -449,9 +511,9 @@ class VideoService:
                     filename=self._get_display_filename(video),
                     status=video.status,
                     created_at_utc=video.created_at_utc.isoformat(sep=" ", timespec="seconds"),
-                    where=metadata.where if metadata else None,
-                    when=metadata.when if metadata else None,
-                    uav_type=metadata.uav_type if metadata else None,
+                    where=metadata.get("where"),
+                    when=metadata.get("when"),
+                    uav_type=metadata.get("uav_type"),
                     duration_sec=video.duration_sec,
                     lock_status=lock_status,
                     can_start_work=can_start_work
@@ -492,7 +554,9 @@ class VideoService:
             # Якщо відео має статус IN_PROGRESS, але не заблоковане - синхронізуємо
             if video.status == VideoStatus.IN_PROGRESS and not lock_status.get("locked"):
                 logger.info(f"Synchronizing video {video_id} status: IN_PROGRESS -> NOT_ANNOTATED (lock expired)")
-                self.source_repo.update_by_id(video_id, {"status": VideoStatus.NOT_ANNOTATED})
+                self.source_repo.update_by_id(
+                    video_id, {"status": VideoStatus.NOT_ANNOTATED}, expected_status=VideoStatus.IN_PROGRESS
+                )
                 video.status = VideoStatus.NOT_ANNOTATED
 
             lock_result = self.lock_service.lock_video(video_id, user_id, user_email)
@@ -506,7 +570,8 @@ class VideoService:
 
             return LockVideoResponse(
                 message=lock_result["message"],
-                expires_at=lock_result.get("expires_at")
+                expires_at=lock_result.get("expires_at"),
+                lease_seconds=lock_result.get("lease_seconds")
             )
 
         except (VideoNotFoundException, VideoNotReadyException, BusinessLogicException):
@@ -515,6 +580,26 @@ class VideoService:
             logger.error(f"Помилка блокування відео {video_id}: {str(e)}")
             raise BusinessLogicException(f"Помилка блокування відео: {str(e)}")
 
+    def extend_video_lock(self, video_id: str, user_id: str) -> LockVideoResponse:
+        """Продовження блокування відео (heartbeat редактора)"""
+        try:
+            lock_result = self.lock_service.extend_video_lock(video_id, user_id)
+
+            if not lock_result["success"]:
+                raise ConflictException(lock_result["error"])
+
+            return LockVideoResponse(
+                message=lock_result["message"],
+                expires_at=lock_result.get("expires_at"),
+                lease_seconds=lock_result.get("lease_seconds")
+            )
+
+        except ConflictException:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка продовження блокування відео {video_id}: {str(e)}")
+            raise BusinessLogicException(f"Помилка продовження блокування відео: {str(e)}")
+
     def unlock_video_for_annotation(self, video_id: str, user_id: str) -> Dict[str, Any]:
         """Розблокування відео"""
         try:
@@ -523,9 +608,9 @@ class VideoService:
             if not unlock_result["success"]:
                 raise BusinessLogicException(unlock_result["error"])
 
-            video = self.source_repo.get_by_id(video_id)
-            if video and video.status == VideoStatus.IN_PROGRESS:
-                self.source_repo.update_by_id(video_id, {"status": VideoStatus.NOT_ANNOTATED})
+            self.source_repo.update_by_id(
+                video_id, {"status": VideoStatus.NOT_ANNOTATED}, expected_status=VideoStatus.IN_PROGRESS
+            )
 
             return unlock_result
 
@@ -537,38 +622,53 @@ class VideoService:
 
 
 
-    def get_video_file_for_streaming_by_id(self, video_id: str, user_id: str) -> Dict[str, Any]:
-        """Безпечне отримання файлу відео для стрімінгу за video_id"""
-        try:
-            # Отримуємо відео з бази даних
-            video = self.source_repo.get_by_id(video_id)
-            if not video:
-                raise VideoNotFoundException(video_id)
+    def _get_streamable_filename(self, video_id: str, user_id: str) -> str:
+        """Перевіряє статус і блокування відео та повертає ім'я локального файлу"""
+        video = self.source_repo.get_by_id(video_id)
+        if not video:
+            raise VideoNotFoundException(video_id)
 
-            if video.status not in [VideoStatus.NOT_ANNOTATED, VideoStatus.IN_PROGRESS]:
-                raise VideoNotReadyException(video.status)
+        if video.status not in [VideoStatus.NOT_ANNOTATED, VideoStatus.IN_PROGRESS]:
+            raise VideoNotReadyException(video.status)
 
-            # Перевіряємо чи має користувач доступ до цього відео
-            video_ids = [video_id]
-            lock_statuses = self.lock_service.get_all_video_locks(video_ids)
-            lock_status = lock_statuses.get(video_id, {"locked": False})
-            
-            if not self._can_user_start_work(video, lock_status, user_id):
-                raise BusinessLogicException("Недостатньо прав для перегляду цього відео")
+        # Перевіряємо чи має користувач доступ до цього відео
+        video_ids = [video_id]
+        lock_statuses = self.lock_service.get_all_video_locks(video_ids)
+        lock_status = lock_statuses.get(video_id, {"locked": False})
+
+        if not self._can_user_start_work(video, lock_status, user_id):
+            raise BusinessLogicException("Недостатньо прав для перегляду цього відео")
+
+        filename = extract_filename_from_azure_path(video.azure_file_path)
+        if not filename:
+            raise BusinessLogicException("Не вдалося визначити ім'я файлу")
 
-            # Отримуємо шлях до локального файлу
-            filename = extract_filename_from_azure_path(video.azure_file_path)
-            if not filename:
-                raise BusinessLogicException("Не вдалося визначити ім'я файлу")
+        return filename
 
+    def get_video_file_for_streaming_by_id(
+            self, video_id: str, user_id: str, quality: str = "proxy"
+    ) -> Dict[str, Any]:
+        """Безпечне отримання файлу відео для стрімінгу за video_id
+
+        За замовчуванням віддається proxy-копія, якщо вона є; quality="original" - повна якість.
+        """
+        try:
+            filename = self._get_streamable_filename(video_id, user_id)
             local_path = get_local_video_path(filename)
 
             if not os.path.exists(local_path):
                 raise BusinessLogicException("Локальний файл не знайдено")
 
+            if quality == "proxy":
+                proxy_filename = get_proxy_filename(filename)
+                proxy_path = get_local_video_path(proxy_filename)
+                if os.path.exists(proxy_path):
+                    filename, local_path = proxy_filename, proxy_path
+
             return {
                 "file_path": local_path,
-                "filename": filename
+                "filename": filename,
+                "validators": get_file_cache_validators(local_path)
             }
 
         except (VideoNotFoundException, VideoNotReadyException, BusinessLogicException):
@@ -577,6 +677,108 @@ class VideoService:
             logger.error(f"Помилка отримання файлу для стрімінгу за video_id {video_id}: {str(e)}")
             raise BusinessLogicException(f"Помилка отримання файлу: {str(e)}")
 
+    def get_hls_playlist(self, video_id: str, user_id: str) -> str:
+        """HLS плейлист відео з підписаним префіксом у посиланнях на сегменти
+
+        Доступ і блокування перевіряються тут. Сегменти адресуються без токена користувача
+        через підпис відео з часом закінчення - однакові URL для всіх, тож nginx кешує їх.
+        """
+        filename = self._get_streamable_filename(video_id, user_id)
+        playlist_path = os.path.join(get_local_hls_dir(filename), HLS_PLAYLIST_NAME)
+
+        if not os.path.exists(playlist_path):
+            raise NotFoundException("HLS плейлист", video_id)
+
+        expires = get_signed_url_expiry(settings.hls_segment_url_ttl_sec)
+        signed_prefix = f"{expires}/{sign_resource(self._get_hls_resource(video_id), expires)}/"
+        with open(playlist_path, "r", encoding="utf-8") as playlist_file:
+            lines = playlist_file.read().splitlines()
+
+        rewritten = []
+        for line in lines:
+            if line.startswith("#EXT-X-MAP:"):
+                line = line.replace(f'URI="{HLS_INIT_NAME}"', f'URI="{signed_prefix}{HLS_INIT_NAME}"')
+            elif line and not line.startswith("#"):
+                line = f"{signed_prefix}{line}"
+            rewritten.append(line)
+
+        return "\n".join(rewritten) + "\n"
+
+    def get_hls_media_file(self, video_id: str, expires: int, signature: str, media_name: str) -> Dict[str, Any]:
+        """Init-сегмент або медіасегмент HLS за підписаним посиланням з плейлиста"""
+        if not verify_resource_signature(self._get_hls_resource(video_id), expires, signature):
+            raise InvalidTokenException("Підпис посилання на HLS сегмент невалідний або прострочений")
+        if not HLS_MEDIA_NAME_PATTERN.match(media_name):
+            raise NotFoundException("HLS сегмент", media_name)
+        return self._get_derived_file(video_id, get_hls_dirname, media_name, "HLS сегмент")
+
+    @staticmethod
+    def _get_hls_resource(video_id: str) -> str:
+        """Ресурс, який підписується для посилань на HLS сегменти відео"""
+        return f"hls:{video_id}"
+
+    def get_thumbnails_index(self, video_id: str, user_id: str) -> Dict[str, Any]:
+        """Індекс спрайтів прев'ю таймлайна"""
+        filename = self._get_streamable_filename(video_id, user_id)
+        index_path = os.path.join(get_local_thumbnails_dir(filename), THUMBNAILS_INDEX_NAME)
+
+        if not os.path.exists(index_path):
+            raise NotFoundException("Прев'ю таймлайна", video_id)
+
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    def get_keyframe_index(self, video_id: str, user_id: str) -> Dict[str, Any]:
+        """Дельта-закодований індекс ключових кадрів оригіналу, з якого нарізаються кліпи"""
+        filename = self._get_streamable_filename(video_id, user_id)
+        keyframes = get_keyframe_index(get_local_video_path(filename))
+
+        if keyframes is None:
+            raise NotFoundException("Індекс ключових кадрів", video_id)
+
+        return {"unit": "ms", "deltas": encode_keyframe_deltas(keyframes)}
+
+    def get_thumbnail_file(self, video_id: str, file_name: str) -> Dict[str, Any]:
+        """Спрайт прев'ю або WebVTT індекс для віддачі через nginx"""
+        if not THUMBNAIL_FILE_NAME_PATTERN.match(file_name):
+            raise NotFoundException("Файл прев'ю", file_name)
+        return self._get_derived_file(video_id, get_thumbnails_dirname, file_name, "Файл прев'ю")
+
+    def _get_derived_file(self, video_id: str, get_dirname, file_name: str, resource: str) -> Dict[str, Any]:
+        """Шлях і валідатори похідного файлу відео; доступ до нього перевіряється лише токеном"""
+        video = self.source_repo.get_by_id(video_id)
+        if not video:
+            raise VideoNotFoundException(video_id)
+
+        filename = extract_filename_from_azure_path(video.azure_file_path)
+        relative_path = f"{get_dirname(filename)}/{file_name}"
+        file_path = get_local_video_path(relative_path)
+        if not os.path.exists(file_path):
+            raise NotFoundException(resource, file_name)
+
+        return {
+            "file_path": file_path,
+            "relative_path": relative_path,
+            "validators": get_file_cache_validators(file_path)
+        }
+
+    def _get_first_clip_metadata(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Метадані першого кліпу для кожного відео сторінки одним запитом"""
+        if not video_ids:
+            return {}
+
+        pipeline = [
+            {"$match": {"source_video_id": {"$in": video_ids}}},
+            {"$sort": {"_id": 1}},
+            {"$group": {
+                "_id": "$source_video_id",
+                "where": {"$first": "$where"},
+                "when": {"$first": "$when"},
+                "uav_type": {"$first": "$uav_type"}
+            }}
+        ]
+        return {row["_id"]: row for row in self.clip_repo.aggregate(pipeline)}
+
     @staticmethod
     def _can_user_start_work(video: Any, lock_status: Dict[str, Any], user_id: Optional[str]) -> bool:
         """Визначення чи може користувач почати роботу з відео"""
@@ -600,7 +802,7 @@ class VideoService:
         """Виправлення відео зі статусом IN_PROGRESS, які не заблоковані (для запуску при старті сервісу)"""
         try:
             # Отримуємо всі відео зі статусом IN_PROGRESS
-            in_progress_videos = [v for v in self.source_repo.get_all() if v.status == VideoStatus.IN_PROGRESS]
+            in_progress_videos = self.source_repo.get_all({"status": VideoStatus.IN_PROGRESS})
             
             if not in_progress_videos:
                 return {
@@ -619,9 +821,12 @@ class VideoService:
                 
                 # Якщо відео має статус IN_PROGRESS, але не заблоковане - виправляємо
                 if not lock_status.get("locked"):
-                    self.source_repo.update_by_id(video_id, {"status": VideoStatus.NOT_ANNOTATED})
-                    logger.info(f"Fixed orphaned IN_PROGRESS video {video_id} -> NOT_ANNOTATED")
-                    fixed_count += 1
+                    result = self.source_repo.update_by_id(
+                        video_id, {"status": VideoStatus.NOT_ANNOTATED}, expected_status=VideoStatus.IN_PROGRESS
+                    )
+                    if result.modified_count:
+                        logger.info(f"Fixed orphaned IN_PROGRESS video {video_id} -> NOT_ANNOTATED")
+                        fixed_count += 1
                     
             return {
                 "success": True,
@@ -1,13 +1,15 @@
 import os
+import json
+import time
 import logging
 import urllib.parse
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 from azure.storage.blob import BlobServiceClient, ContainerClient
 from azure.identity import ClientSecretCredential
+from azure.core import MatchConditions
 from azure.core.exceptions import ResourceNotFoundError
 
 from backend.config.settings import get_settings
@@ -87,23 +89,135 @@ def parse_azure_blob_url(azure_url: str) -> Dict[str, str]:
         raise
 
 
-def download_chunk(blob_client, start: int, end: int, chunk_index: int) -> bytes:
-    """Завантажує частину blob"""
+def download_chunk(blob_client, start: int, end: int, chunk_index: int, etag: Optional[str] = None) -> bytes:
+    """Завантажує частину blob (за наявності etag - лише з тієї ж версії blob)"""
     try:
         logger.debug(f"Завантаження частини {chunk_index}: {start}-{end} ({(end - start + 1) / (1024 * 1024):.1f} MB)")
-        stream = blob_client.download_blob(offset=start, length=end - start + 1)
+        if etag:
+            stream = blob_client.download_blob(
+                offset=start, length=end - start + 1,
+                etag=etag, match_condition=MatchConditions.IfNotModified
+            )
+        else:
+            stream = blob_client.download_blob(offset=start, length=end - start + 1)
         return stream.readall()
     except Exception as e:
         logger.error(f"Помилка завантаження частини {chunk_index}: {str(e)}")
         raise
 
 
+def write_at_offset(fd: int, data: bytes, offset: int) -> None:
+    """Записує дані у файл за вказаним зміщенням без зміни позиції дескриптора"""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def download_chunk_to_file(
+        blob_client,
+        fd: int,
+        start: int,
+        end: int,
+        chunk_index: int,
+        etag: Optional[str] = None
+) -> int:
+    """Завантажує частину blob і одразу записує її у файл на своє місце"""
+    data = download_chunk(blob_client, start, end, chunk_index, etag)
+    write_at_offset(fd, data, start)
+    return len(data)
+
+
+def get_partial_download_path(local_path: str) -> str:
+    """Шлях до частково завантаженого файлу"""
+    return f"{local_path}.part"
+
+
+def get_download_manifest_path(local_path: str) -> str:
+    """Шлях до маніфесту завершених частин поруч з частковим файлом"""
+    return f"{get_partial_download_path(local_path)}.json"
+
+
+def load_download_manifest(
+        local_path: str,
+        etag: str,
+        file_size: int,
+        chunk_size: int
+) -> Tuple[int, Set[int]]:
+    """Повертає (кількість суцільно завантажених частин від початку, індекси частин поза нею)
+
+    Якщо маніфест не відповідає поточній версії blob - (0, порожня множина).
+    """
+    manifest_path = get_download_manifest_path(local_path)
+    partial_path = get_partial_download_path(local_path)
+
+    try:
+        if not os.path.exists(manifest_path) or not os.path.exists(partial_path):
+            return 0, set()
+
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        if (manifest.get("etag") != etag
+                or manifest.get("file_size") != file_size
+                or manifest.get("chunk_size") != chunk_size
+                or os.path.getsize(partial_path) != file_size):
+            logger.info(f"Маніфест {manifest_path} не відповідає поточному blob, завантаження з початку")
+            return 0, set()
+
+        return manifest.get("contiguous_chunks", 0), set(manifest.get("extra_chunks", []))
+
+    except Exception as e:
+        logger.warning(f"Не вдалося прочитати маніфест {manifest_path}: {str(e)}")
+        return 0, set()
+
+
+def save_download_manifest(
+        local_path: str,
+        etag: str,
+        file_size: int,
+        chunk_size: int,
+        contiguous_chunks: int,
+        extra_chunks: Set[int]
+) -> None:
+    """Атомарно зберігає маніфест: межу суцільно завантажених частин і невеликий набір частин поза нею"""
+    manifest_path = get_download_manifest_path(local_path)
+    tmp_path = f"{manifest_path}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump({
+            "etag": etag,
+            "file_size": file_size,
+            "chunk_size": chunk_size,
+            "contiguous_chunks": contiguous_chunks,
+            "extra_chunks": sorted(extra_chunks)
+        }, manifest_file)
+
+    os.replace(tmp_path, manifest_path)
+
+
+def cleanup_partial_download(local_path: str) -> None:
+    """Видаляє частковий файл та його маніфест"""
+    for path in (get_partial_download_path(local_path), get_download_manifest_path(local_path)):
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+        except Exception as e:
+            logger.error(f"Помилка видалення файлу {path}: {str(e)}")
+
+
 def download_blob_to_local_parallel_with_progress(
         azure_url: str,
         local_path: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        contiguous_callback: Optional[Callable[[int], None]] = None
 ) -> Dict[str, Any]:
-    """Завантажує blob з Azure у локальний файл з паралельним завантаженням та прогресом"""
+    """Завантажує blob з Azure у локальний файл з паралельним завантаженням та прогресом
+
+    contiguous_callback отримує кількість байтів, суцільно записаних у .part файл від початку, -
+    за ним споживач (конвеєр ffmpeg) може читати файл, поки він ще завантажується.
+    """
     try:
         blob_info = parse_azure_blob_url(azure_url)
         blob_service_client = get_blob_service_client()
@@ -127,48 +241,105 @@ def download_blob_to_local_parallel_with_progress(
         if file_size < settings.azure_download_chunk_size * 2:
             return download_blob_to_local_simple_with_progress(blob_client, local_path, file_size, progress_callback)
 
+        chunk_size = settings.azure_download_chunk_size
+        etag = properties.etag
+
         # Розбиваємо на частини
         chunks = []
-        for i in range(0, file_size, settings.azure_download_chunk_size):
+        for i in range(0, file_size, chunk_size):
             start = i
-            end = min(i + settings.azure_download_chunk_size - 1, file_size - 1)
+            end = min(i + chunk_size - 1, file_size - 1)
             chunks.append((start, end, len(chunks)))
 
+        # Продовжуємо попереднє завантаження, якщо blob не змінився з того часу
+        partial_path = get_partial_download_path(local_path)
+        contiguous_chunks, extra_chunks = load_download_manifest(local_path, etag, file_size, chunk_size)
+
+        def is_completed(chunk_index: int) -> bool:
+            return chunk_index < contiguous_chunks or chunk_index in extra_chunks
+
+        remaining_chunks = [chunk for chunk in chunks if not is_completed(chunk[2])]
+
+        if len(remaining_chunks) < len(chunks):
+            logger.info(
+                f"Продовження завантаження {local_path}: "
+                f"{len(chunks) - len(remaining_chunks)}/{len(chunks)} частин вже завантажено")
+        else:
+            cleanup_partial_download(local_path)
+
         logger.info(
-            f"Завантаження {len(chunks)} частин по {settings.azure_download_chunk_size / (1024 * 1024):.1f} MB з {settings.azure_max_concurrency} потоками")
-
-        # Прогрес-трекінг
-        completed_chunks = 0
-        progress_lock = threading.Lock()
-
-        def update_progress():
-            """Оновлює прогрес на основі завершених частин"""
-            nonlocal completed_chunks
-            with progress_lock:
-                completed_chunks += 1
-                if progress_callback:
-                    progress_percent = (completed_chunks / len(chunks)) * 50
-                    estimated_bytes = int((completed_chunks / len(chunks)) * file_size)
-                    progress_callback(estimated_bytes, file_size)
-
-        # Паралельне завантаження частин з оригінальною логікою
-        with ThreadPoolExecutor(max_workers=settings.azure_max_concurrency) as executor:
-            futures = []
-
-            for start, end, chunk_index in chunks:
-                future = executor.submit(download_chunk, blob_client, start, end, chunk_index)
-                futures.append((chunk_index, future))
-
-            # Збираємо результати в правильному порядку
-            chunk_results = {}
-            for chunk_index, future in futures:
-                chunk_results[chunk_index] = future.result()
-                update_progress()  # Оновлюємо прогрес після завершення кожної частини
-
-        # Записуємо файл
-        with open(local_path, "wb") as output_file:
-            for i in range(len(chunks)):
-                output_file.write(chunk_results[i])
+            f"Завантаження {len(remaining_chunks)} частин по {chunk_size / (1024 * 1024):.1f} MB з {settings.azure_max_concurrency} потоками")
+
+        # Файл виділяється наперед, кожен потік пише свою частину за її зміщенням,
+        # тож у пам'яті одночасно перебуває не більше azure_max_concurrency частин
+        fd = os.open(partial_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, file_size)
+
+            downloaded_bytes = sum(end - start + 1 for start, end, chunk_index in chunks if is_completed(chunk_index))
+            pending_chunks = iter(remaining_chunks)
+
+            def report_contiguous() -> None:
+                if contiguous_callback:
+                    contiguous_callback(min(contiguous_chunks * chunk_size, file_size))
+
+            report_contiguous()
+
+            # Маніфест пишеться раз на K частин або T секунд: частини після останньої
+            # контрольної точки при збої просто завантажаться повторно
+            unsaved_chunks = 0
+            last_checkpoint = time.monotonic()
+
+            def checkpoint() -> None:
+                """Скидає дані на диск і лише потім фіксує їх у маніфесті"""
+                nonlocal unsaved_chunks, last_checkpoint
+                os.fdatasync(fd)
+                save_download_manifest(local_path, etag, file_size, chunk_size, contiguous_chunks, extra_chunks)
+                unsaved_chunks = 0
+                last_checkpoint = time.monotonic()
+
+            with ThreadPoolExecutor(max_workers=settings.azure_max_concurrency) as executor:
+                in_flight = {}
+
+                def submit_next() -> None:
+                    """Додає наступну частину у вікно завантаження"""
+                    next_chunk = next(pending_chunks, None)
+                    if next_chunk is not None:
+                        start, end, chunk_index = next_chunk
+                        future = executor.submit(
+                            download_chunk_to_file, blob_client, fd, start, end, chunk_index, etag
+                        )
+                        in_flight[future] = chunk_index
+
+                for _ in range(settings.azure_max_concurrency):
+                    submit_next()
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk_index = in_flight.pop(future)
+                        downloaded_bytes += future.result()
+
+                        extra_chunks.add(chunk_index)
+                        if chunk_index == contiguous_chunks:
+                            while contiguous_chunks in extra_chunks:
+                                extra_chunks.remove(contiguous_chunks)
+                                contiguous_chunks += 1
+                            report_contiguous()
+
+                        unsaved_chunks += 1
+                        if (unsaved_chunks >= settings.azure_manifest_checkpoint_chunks
+                                or time.monotonic() - last_checkpoint >= settings.azure_manifest_checkpoint_sec):
+                            checkpoint()
+
+                        if progress_callback:
+                            progress_callback(downloaded_bytes, file_size)
+                        submit_next()
+        finally:
+            os.close(fd)
+
+        os.replace(partial_path, local_path)
+        cleanup_partial_download(local_path)
 
         # Фінальне оновлення прогресу
         if progress_callback:
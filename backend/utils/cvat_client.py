@@ -0,0 +1,204 @@
+import os
+import time
+import base64
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config.settings import get_settings
+from backend.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__, "utils.log")
+
+TUS_VERSION = "1.0.0"
+TASK_FINAL_STATES = {"Finished", "Failed"}
+
+
+class CVATClientError(Exception):
+    """Помилка взаємодії з CVAT REST API"""
+    pass
+
+
+class CVATClient:
+    """Клієнт CVAT REST API з постійною автентифікованою сесією та пулом з'єднань"""
+
+    def __init__(
+            self,
+            base_url: str,
+            username: str,
+            password: str,
+            pool_size: int = 10,
+            request_timeout: int = 60,
+            upload_chunk_size: int = 8388608
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.request_timeout = request_timeout
+        self.upload_chunk_size = upload_chunk_size
+
+        self._auth_lock = threading.Lock()
+        self._token: Optional[str] = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def login(self) -> None:
+        """Автентифікується в CVAT і зберігає токен для наступних запитів"""
+        response = self.session.post(
+            f"{self.base_url}/api/auth/login",
+            json={"username": self.username, "password": self.password},
+            timeout=self.request_timeout
+        )
+        if response.status_code != 200:
+            raise CVATClientError(f"Не вдалося автентифікуватися в CVAT: {response.status_code} {response.text}")
+
+        self._token = response.json()["key"]
+        self.session.headers["Authorization"] = f"Token {self._token}"
+        logger.debug("Автентифікація в CVAT успішна")
+
+    def _ensure_logged_in(self) -> None:
+        """Виконує вхід один раз для всіх потоків процесу"""
+        if self._token:
+            return
+        with self._auth_lock:
+            if not self._token:
+                self.login()
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Виконує запит до API з повторною автентифікацією при 401"""
+        self._ensure_logged_in()
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.request_timeout)
+
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401:
+            logger.info("Токен CVAT недійсний, повторна автентифікація")
+            with self._auth_lock:
+                self._token = None
+                self.login()
+            response = self.session.request(method, url, **kwargs)
+
+        return response
+
+    @staticmethod
+    def _expect_status(response: requests.Response, *expected: int) -> None:
+        """Перевіряє статус відповіді"""
+        if response.status_code not in expected:
+            raise CVATClientError(
+                f"{response.request.method} {response.url}: "
+                f"очікувався статус {expected}, отримано {response.status_code} {response.text[:500]}"
+            )
+
+    def create_task(self, name: str, project_id: int, overlap: int, segment_size: int) -> int:
+        """Створює порожнє завдання в проєкті і повертає його ID"""
+        response = self._request("POST", "/api/tasks", json={
+            "name": name,
+            "project_id": project_id,
+            "overlap": overlap,
+            "segment_size": segment_size
+        })
+        self._expect_status(response, 201)
+        return response.json()["id"]
+
+    def upload_task_data(self, task_id: int, file_path: str, data_params: Dict[str, Any]) -> None:
+        """Завантажує файл у завдання частинами через протокол TUS"""
+        data_url = f"/api/tasks/{task_id}/data/"
+
+        response = self._request("POST", data_url, headers={"Upload-Start": ""})
+        self._expect_status(response, 202)
+
+        self._tus_upload_file(data_url, file_path)
+
+        response = self._request("POST", data_url, headers={"Upload-Finish": ""}, json=data_params)
+        self._expect_status(response, 202)
+
+    def _tus_upload_file(self, data_url: str, file_path: str) -> None:
+        """Завантажує один файл частинами через TUS"""
+        file_size = os.path.getsize(file_path)
+        encoded_name = base64.b64encode(os.path.basename(file_path).encode()).decode()
+
+        response = self._request("POST", data_url, headers={
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Length": str(file_size),
+            "Upload-Metadata": f"filename {encoded_name}"
+        })
+        self._expect_status(response, 201)
+
+        location = response.headers.get("Location")
+        if not location:
+            raise CVATClientError("CVAT не повернув Location для TUS завантаження")
+        if not location.startswith("http"):
+            location = f"{self.base_url}{location}"
+
+        offset = 0
+        with open(file_path, "rb") as f:
+            while offset < file_size:
+                chunk = f.read(self.upload_chunk_size)
+                response = self._request("PATCH", location, data=chunk, headers={
+                    "Tus-Resumable": TUS_VERSION,
+                    "Upload-Offset": str(offset),
+                    "Content-Type": "application/offset+octet-stream"
+                })
+                self._expect_status(response, 204)
+                offset = int(response.headers.get("Upload-Offset", offset + len(chunk)))
+
+        logger.debug(f"TUS завантаження завершено: {file_path} ({file_size} байт)")
+
+    def get_task_status(self, task_id: int) -> Dict[str, Any]:
+        """Отримує стан обробки даних завдання"""
+        response = self._request("GET", f"/api/tasks/{task_id}/status")
+        self._expect_status(response, 200)
+        return response.json()
+
+    def wait_for_task(self, task_id: int, timeout: int, poll_interval: float = 1.0,
+                      max_poll_interval: float = 10.0) -> Dict[str, Any]:
+        """Очікує завершення обробки даних завдання зі зростаючим інтервалом опитування
+
+        Очікування синхронне: воркер кліпу блокується до фінального стану або тайм-ауту,
+        тому завдання кліпу в chord-і завершується лише з готовим завданням CVAT.
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            status = self.get_task_status(task_id)
+            if status.get("state") in TASK_FINAL_STATES:
+                return status
+
+            if time.monotonic() >= deadline:
+                raise CVATClientError(f"Перевищено час очікування обробки завдання {task_id}")
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+
+    def delete_task(self, task_id: int) -> None:
+        """Видаляє завдання"""
+        response = self._request("DELETE", f"/api/tasks/{task_id}")
+        self._expect_status(response, 204, 404)
+
+
+def get_cvat_base_url() -> str:
+    """Формує базовий URL CVAT з налаштувань"""
+    host = settings.cvat_host
+    if not host.startswith(("http://", "https://")):
+        host = f"http://{host}"
+    return f"{host.rstrip('/')}:{settings.cvat_port}"
+
+
+@lru_cache
+def get_cvat_client() -> CVATClient:
+    """Повертає спільний для процесу клієнт CVAT (створюється при першому використанні)"""
+    return CVATClient(
+        base_url=get_cvat_base_url(),
+        username=settings.cvat_username,
+        password=settings.cvat_password,
+        pool_size=settings.cvat_pool_size,
+        request_timeout=settings.cvat_request_timeout,
+        upload_chunk_size=settings.cvat_upload_chunk_size
+    )
@@ -0,0 +1,40 @@
+import json
+from functools import lru_cache
+from typing import Dict, Any
+
+import redis
+
+from backend.config.settings import get_settings
+from backend.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__, "utils.log")
+
+PROGRESS_CHANNEL_PREFIX = "task_progress:"
+TERMINAL_TASK_STATUSES = {"completed", "failed"}
+
+
+def get_progress_channel(task_id: str) -> str:
+    """Назва pub/sub каналу прогресу завдання"""
+    return f"{PROGRESS_CHANNEL_PREFIX}{task_id}"
+
+
+@lru_cache
+def _get_redis_client() -> redis.Redis:
+    """Спільний для процесу Redis клієнт для публікації прогресу"""
+    return redis.from_url(settings.redis_url, decode_responses=True)
+
+
+def publish_task_progress(task_id: str, status: str, progress: int, stage: str, message: str) -> None:
+    """Публікує подію прогресу завдання; помилки публікації не зупиняють обробку"""
+    payload: Dict[str, Any] = {
+        "task_id": task_id,
+        "status": status,
+        "progress": progress,
+        "stage": stage,
+        "message": message
+    }
+    try:
+        _get_redis_client().publish(get_progress_channel(task_id), json.dumps(payload))
+    except Exception as e:
+        logger.warning(f"Не вдалося опублікувати прогрес завдання {task_id}: {str(e)}")
@@ -0,0 +1,32 @@
+import hashlib
+import hmac
+import time
+
+from backend.config.settings import get_settings
+
+settings = get_settings()
+
+SIGNATURE_LENGTH = 32
+
+
+def get_signed_url_expiry(ttl_sec: int) -> int:
+    """Час закінчення підпису, вирівняний на вікно ttl_sec
+
+    Усі користувачі в межах одного вікна отримують однакові URL, тому спільний
+    кеш (nginx, CDN) повторно використовує ті самі об'єкти. Підпис діє від ttl_sec
+    до 2 * ttl_sec.
+    """
+    return (int(time.time()) // ttl_sec + 2) * ttl_sec
+
+
+def sign_resource(resource: str, expires: int) -> str:
+    """HMAC підпис ресурсу з часом закінчення"""
+    message = f"{resource}:{expires}".encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def verify_resource_signature(resource: str, expires: int, signature: str) -> bool:
+    """Перевіряє підпис ресурсу і те, що він ще не прострочений"""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_resource(resource, expires), signature)
@@ -1,13 +1,24 @@
 import os
+import bisect
+import shutil
 import subprocess
 import json
-from typing import Optional, Dict, Any
+from email.utils import formatdate
+from typing import Optional, Dict, Any, List
 from backend.utils.logger import get_logger
 from backend.config.settings import get_settings
 
 settings = get_settings()
 logger = get_logger(__name__, "utils.log")
 
+HLS_PLAYLIST_NAME = "playlist.m3u8"
+HLS_INIT_NAME = "init.mp4"
+HLS_SEGMENT_PATTERN = "segment_%05d.m4s"
+
+THUMBNAILS_INDEX_NAME = "thumbnails.json"
+THUMBNAILS_VTT_NAME = "thumbnails.vtt"
+THUMBNAIL_SPRITE_PATTERN = "sprite_%03d.jpg"
+
 
 def get_video_info(video_path: str) -> Optional[Dict[str, Any]]:
     """Отримує детальну інформацію про відео"""
@@ -87,6 +98,114 @@ def get_video_fps(video_path: str) -> Optional[float]:
         return None
 
 
+def get_keyframe_times(video_path: str) -> Optional[List[float]]:
+    """Повертає час ключових кадрів (від початку відео) за пакетами ffprobe без декодування"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags:format=start_time",
+        "-of", "csv",
+        video_path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+        start_time = 0.0
+        keyframes = []
+
+        for line in result.stdout.splitlines():
+            parts = line.strip().split(",")
+            if parts[0] == "format" and len(parts) > 1 and parts[1] not in ("", "N/A"):
+                start_time = float(parts[1])
+            elif parts[0] == "packet" and len(parts) > 2 and "K" in parts[2] and parts[1] not in ("", "N/A"):
+                keyframes.append(float(parts[1]))
+
+        keyframes = sorted(round(max(t - start_time, 0.0), 3) for t in keyframes)
+
+        logger.debug(f"Знайдено {len(keyframes)} ключових кадрів у {video_path}")
+        return keyframes
+
+    except Exception as e:
+        logger.error(f"Помилка отримання ключових кадрів для {video_path}: {str(e)}")
+        return None
+
+
+def get_keyframe_index_path(video_path: str) -> str:
+    """Шлях до sidecar-файлу з індексом ключових кадрів відео"""
+    return f"{os.path.splitext(video_path)[0]}_keyframes.json"
+
+
+def encode_keyframe_deltas(keyframes: List[float]) -> List[int]:
+    """Дельта-кодування часу ключових кадрів у мілісекундах"""
+    deltas = []
+    previous_ms = 0
+    for seconds in keyframes:
+        current_ms = int(round(seconds * 1000))
+        deltas.append(current_ms - previous_ms)
+        previous_ms = current_ms
+    return deltas
+
+
+def decode_keyframe_deltas(deltas: List[int]) -> List[float]:
+    """Відновлює час ключових кадрів у секундах з дельт у мілісекундах"""
+    keyframes = []
+    current_ms = 0
+    for delta in deltas:
+        current_ms += delta
+        keyframes.append(current_ms / 1000)
+    return keyframes
+
+
+def get_keyframe_index(video_path: str) -> Optional[List[float]]:
+    """Ключові кадри з sidecar-індексу; пакетний ffprobe запускається лише якщо файл змінився
+
+    Індекс прив'язаний до розміру та mtime файлу, тому після конвертації на місці
+    він автоматично перебудовується для нового файлу.
+    """
+    index_path = get_keyframe_index_path(video_path)
+
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        if index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+            return decode_keyframe_deltas(index["deltas"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    keyframes = get_keyframe_times(video_path)
+    if keyframes is None:
+        return None
+
+    try:
+        partial_path = f"{index_path}.part"
+        with open(partial_path, "w", encoding="utf-8") as index_file:
+            json.dump({
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "unit": "ms",
+                "deltas": encode_keyframe_deltas(keyframes)
+            }, index_file, separators=(",", ":"))
+        os.replace(partial_path, index_path)
+        logger.debug(f"Збережено індекс {len(keyframes)} ключових кадрів: {index_path}")
+    except Exception as e:
+        logger.warning(f"Не вдалося зберегти індекс ключових кадрів {index_path}: {str(e)}")
+
+    return keyframes
+
+
+def keyframe_at_or_before(keyframes: List[float], seconds: float) -> float:
+    """Найближчий ключовий кадр не пізніше заданого часу - точка, з якої почнеться копіювання потоку"""
+    position = bisect.bisect_right(keyframes, seconds) - 1
+    return keyframes[position] if position >= 0 else 0.0
+
+
 def trim_video_clip(source_path: str, output_path: str, start_time: str, end_time: str) -> bool:
     """Нарізає відео фрагмент за допомогою FFmpeg"""
     try:
@@ -119,6 +238,64 @@ def trim_video_clip(source_path: str, output_path: str, start_time: str, end_tim
         return False
 
 
+def trim_video_clips_batch(
+        source_path: str,
+        clips: List[Dict[str, Any]],
+        keyframes: List[float]
+) -> Dict[str, bool]:
+    """Нарізає кілька фрагментів за один прохід FFmpeg по джерелу
+
+    Кожен елемент clips містить output_path, start_sec та end_sec. Початок кожного
+    кліпу зсувається на ключовий кадр перед start_sec - так само, як це робить
+    trim_video_clip з -ss перед -i при копіюванні потоків.
+    """
+    if not clips:
+        return {}
+
+    seek_points = [keyframe_at_or_before(keyframes, clip["start_sec"]) for clip in clips]
+    input_seek = min(seek_points)
+
+    command = [
+        "ffmpeg", "-y",
+        "-loglevel", settings.ffmpeg_log_level,
+        "-ss", f"{input_seek:.3f}",
+        "-i", source_path
+    ]
+
+    for clip, seek_point in zip(clips, seek_points):
+        command.extend([
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            "-ss", f"{max(seek_point - input_seek - 0.001, 0):.3f}",
+            "-to", f"{clip['end_sec'] - input_seek:.3f}",
+            "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            clip["output_path"]
+        ])
+
+    try:
+        logger.debug(f"Batch trim command: {' '.join(command)}")
+
+        result = subprocess.run(command, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            logger.error(f"Помилка пакетної нарізки відео. FFmpeg stderr: {result.stderr}")
+
+        results = {}
+        for clip in clips:
+            output_path = clip["output_path"]
+            results[output_path] = (
+                result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0
+            )
+
+        logger.info(f"Пакетна нарізка {source_path}: {sum(results.values())}/{len(clips)} кліпів за один прохід")
+        return results
+
+    except Exception as e:
+        logger.error(f"Помилка при пакетній нарізці відео: {str(e)}")
+        return {clip["output_path"]: False for clip in clips}
+
+
 def format_filename(
         metadata: Dict[str, Any],
         original_filename: str,
@@ -158,4 +335,60 @@ def cleanup_file(file_path: str) -> None:
 def get_local_video_path(filename: str) -> str:
     """Конструює локальний шлях для відео файлу"""
     local_videos_dir = os.path.join(settings.temp_folder, "source_videos")
-    return os.path.join(local_videos_dir, filename)
\ No newline at end of file
+    return os.path.join(local_videos_dir, filename)
+
+
+def get_proxy_filename(filename: str) -> str:
+    """Ім'я файлу легкої proxy-копії відео для редактора"""
+    return f"{os.path.splitext(filename)[0]}_proxy.mp4"
+
+
+def get_local_proxy_path(filename: str) -> str:
+    """Локальний шлях до proxy-копії відео"""
+    return get_local_video_path(get_proxy_filename(filename))
+
+
+def get_hls_dirname(filename: str) -> str:
+    """Назва директорії з HLS плейлистом і сегментами відео"""
+    return f"{os.path.splitext(filename)[0]}_hls"
+
+
+def get_local_hls_dir(filename: str) -> str:
+    """Локальний шлях до HLS директорії відео"""
+    return get_local_video_path(get_hls_dirname(filename))
+
+
+def get_thumbnails_dirname(filename: str) -> str:
+    """Назва директорії зі спрайтами прев'ю відео"""
+    return f"{os.path.splitext(filename)[0]}_thumbs"
+
+
+def get_local_thumbnails_dir(filename: str) -> str:
+    """Локальний шлях до директорії зі спрайтами прев'ю"""
+    return get_local_video_path(get_thumbnails_dirname(filename))
+
+
+def format_vtt_timestamp(seconds: float) -> str:
+    """Час у форматі WebVTT (HH:MM:SS.mmm)"""
+    total_ms = int(round(seconds * 1000))
+    hours, remainder = divmod(total_ms, 3600000)
+    minutes, remainder = divmod(remainder, 60000)
+    secs, ms = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
+
+
+def cleanup_derived_files(filename: str) -> None:
+    """Видаляє похідні файли відео: proxy-копію, HLS сегменти, спрайти прев'ю та індекс ключових кадрів"""
+    cleanup_file(get_local_proxy_path(filename))
+    cleanup_file(get_keyframe_index_path(get_local_video_path(filename)))
+    shutil.rmtree(get_local_hls_dir(filename), ignore_errors=True)
+    shutil.rmtree(get_local_thumbnails_dir(filename), ignore_errors=True)
+
+
+def get_file_cache_validators(file_path: str) -> Dict[str, str]:
+    """ETag і Last-Modified у форматі nginx, щоб валідатори збігалися при X-Accel-Redirect"""
+    stat = os.stat(file_path)
+    return {
+        "ETag": f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True)
+    }
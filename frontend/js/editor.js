@@ -41,7 +41,11 @@ class VideoEditor {
             videoFileName: null,
             projectFragments: { 'motion_detection': [], 'military_targets_detection_and_tracking_moving': [], 'military_targets_detection_and_tracking_static': [], 're_id': [] },
             unfinishedFragments: { 'motion_detection': null, 'military_targets_detection_and_tracking_moving': null, 'military_targets_detection_and_tracking_static': null, 're_id': null },
-            activeProjects: []
+            activeProjects: [],
+            lockHeartbeatTimer: null,
+            videoQuality: 'proxy',
+            thumbnails: null,
+            keyframes: null
         };
 
         if (document.getElementById('project-modal')) {
@@ -69,6 +73,8 @@ class VideoEditor {
             unfinishedFragmentsStatus: $('unfinished-fragments-status'),
             videoLockInfo: $('video-lock-info'),
             lockExpiresTime: $('lock-expires-time'),
+            videoQualityToggle: $('video-quality-toggle'),
+            timelinePreview: $('timeline-preview'),
 
             metadataForm: {
                 skipVideo: $('skip-video'),
@@ -120,6 +126,9 @@ class VideoEditor {
         this.elements.saveFragmentsBtn?.addEventListener('click', () => this._handleSaveFragments());
 
         this.elements.timeline?.addEventListener('click', e => this._handleTimelineClick(e));
+        this.elements.timeline?.addEventListener('mousemove', e => this._showTimelinePreview(e));
+        this.elements.timeline?.addEventListener('mouseleave', () => this.elements.timelinePreview?.classList.add('hidden'));
+        this.elements.videoQualityToggle?.addEventListener('click', () => this._toggleVideoQuality());
         this.elements.metadataForm?.skipVideo?.addEventListener('change', () => this._handleSkipChange());
         
         // Add back button handler
@@ -127,6 +136,7 @@ class VideoEditor {
         if (backButton) {
             backButton.addEventListener('click', async () => {
                 if (this.state.currentVideoId) {
+                    this._stopLockHeartbeat();
                     try {
                         await api.post(`/video/${this.state.currentVideoId}/unlock`);
                     } catch (error) {
@@ -182,22 +192,15 @@ class VideoEditor {
             this.elements.videoFilenameSpan.textContent = video.filename;
 
             // Показуємо інформацію про блокування з API відповіді
-            if (lockResult.expires_at) {
-                const expiresAt = new Date(lockResult.expires_at);
-                this.elements.lockExpiresTime.textContent = expiresAt.toLocaleTimeString();
-                this.elements.videoLockInfo.style.display = 'flex';
-            } else {
-                this.elements.videoLockInfo.style.display = 'none';
-            }
-
-            // Використовуємо новий безпечний endpoint з video_id замість Azure параметрів
-            const videoUrl = `/video/${video.id}/stream?token=${auth.token}`;
+            this._updateLockInfo(lockResult.expires_at);
+            this._startLockHeartbeat(lockResult.lease_seconds);
 
             this._removeVideoEventListeners();
             this._addVideoEventListeners();
 
-            this.elements.videoPlayer.src = videoUrl;
-            this.elements.videoPlayer.load();
+            this._attachVideoSource();
+            this._loadThumbnails();
+            this._loadKeyframes();
 
             this._resetFragments();
             
@@ -228,6 +231,60 @@ class VideoEditor {
         });
     }
 
+    _getVideoUrl() {
+        // Безпечний endpoint з video_id; за замовчуванням легка proxy-копія
+        return `/video/${this.state.currentVideoId}/stream?token=${auth.token}&quality=${this.state.videoQuality}`;
+    }
+
+    _attachVideoSource() {
+        const player = this.elements.videoPlayer;
+        const playProgressive = () => {
+            this._destroyHls();
+            player.src = this._getVideoUrl();
+            player.load();
+        };
+
+        this._destroyHls();
+
+        // HLS пакується з proxy-копії; оригінал і браузери без MSE - звичайний стрімінг
+        if (this.state.videoQuality !== 'proxy' || !window.Hls?.isSupported()) {
+            return playProgressive();
+        }
+
+        this.hls = new Hls();
+        this.hls.on(Hls.Events.ERROR, (_, data) => {
+            // Плейлиста ще немає або сегмент недоступний - переходимо на звичайний стрімінг
+            if (data.fatal) playProgressive();
+        });
+        this.hls.loadSource(`/video/${this.state.currentVideoId}/hls/playlist.m3u8?token=${auth.token}`);
+        this.hls.attachMedia(player);
+    }
+
+    _destroyHls() {
+        if (this.hls) {
+            this.hls.destroy();
+            this.hls = null;
+        }
+    }
+
+    _toggleVideoQuality() {
+        if (!this.state.currentVideoId) return;
+
+        const player = this.elements.videoPlayer;
+        const { currentTime, paused } = player;
+
+        this.state.videoQuality = this.state.videoQuality === 'proxy' ? 'original' : 'proxy';
+        this.elements.videoQualityToggle.textContent =
+            this.state.videoQuality === 'proxy' ? 'Оригінальна якість' : 'Легка копія';
+
+        player.addEventListener('loadedmetadata', () => {
+            player.currentTime = currentTime;
+            if (!paused) player.play();
+        }, { once: true });
+
+        this._attachVideoSource();
+    }
+
     _handleVideoError(e) {
         console.error('Помилка відтворення відео:', e);
         notify('Помилка відтворення відео', 'error');
@@ -244,6 +301,75 @@ class VideoEditor {
         this.elements.timelineProgress.style.width = `${progress}%`;
     }
 
+    async _loadThumbnails() {
+        this.state.thumbnails = null;
+        try {
+            // Прев'ю генеруються фоново після конвертації - поки їх немає, таймлайн працює без них
+            this.state.thumbnails = await api.get(`/video/${this.state.currentVideoId}/thumbnails`);
+        } catch {
+            this.state.thumbnails = null;
+        }
+    }
+
+    async _loadKeyframes() {
+        this.state.keyframes = null;
+        try {
+            const data = await api.get(`/video/${this.state.currentVideoId}/keyframes`);
+            let currentMs = 0;
+            this.state.keyframes = data?.deltas.map(delta => (currentMs += delta) / 1000) || null;
+        } catch {
+            this.state.keyframes = null;
+        }
+    }
+
+    _getClipCutStart(startTime) {
+        // Кліпи нарізаються без перекодування: фактичний початок - ключовий кадр не пізніше цілої секунди мітки
+        const keyframes = this.state.keyframes;
+        if (!keyframes?.length) return startTime;
+
+        const target = Math.floor(startTime);
+        let low = 0;
+        let high = keyframes.length - 1;
+        let result = 0;
+        while (low <= high) {
+            const middle = (low + high) >> 1;
+            if (keyframes[middle] <= target) {
+                result = keyframes[middle];
+                low = middle + 1;
+            } else {
+                high = middle - 1;
+            }
+        }
+        return result;
+    }
+
+    _showTimelinePreview(e) {
+        const thumbnails = this.state.thumbnails;
+        const preview = this.elements.timelinePreview;
+        const duration = this.elements.videoPlayer.duration;
+        if (!thumbnails || !preview || !duration) return;
+
+        const rect = this.elements.timeline.getBoundingClientRect();
+        const x = Math.min(Math.max(e.clientX - rect.left, 0), rect.width);
+        const time = (x / rect.width) * duration;
+
+        const { interval, width, height, columns, rows, count, sheets } = thumbnails;
+        const index = Math.min(Math.floor(time / interval), count - 1);
+        const perSheet = columns * rows;
+        const position = index % perSheet;
+        const sheet = sheets[Math.floor(index / perSheet)];
+
+        Object.assign(preview.style, {
+            width: `${width}px`,
+            height: `${height}px`,
+            left: `${Math.min(Math.max(x - width / 2, 0), rect.width - width)}px`,
+            backgroundImage: `url(/video/${this.state.currentVideoId}/thumbnails/${sheet}?token=${auth.token})`,
+            backgroundPosition: `-${(position % columns) * width}px -${Math.floor(position / columns) * height}px`
+        });
+        preview.querySelector('.timeline-preview-time').textContent = utils.formatTime(time);
+        preview.classList.remove('hidden');
+    }
+
     _handleTimelineClick(e) {
         const rect = this.elements.timeline.getBoundingClientRect();
         const x = e.clientX - rect.left;
@@ -484,6 +610,7 @@ class VideoEditor {
 
     async _setFragmentStart() {
         const startTime = this.elements.videoPlayer.currentTime;
+        const cutStart = this._getClipCutStart(startTime);
 
         for (const project of this.state.activeProjects) {
             if (this.state.unfinishedFragments[project]) {
@@ -497,9 +624,10 @@ class VideoEditor {
             Object.assign(marker, {
                 className: `fragment-marker start ${project}`,
                 title: `${this._getProjectName(project)}: ${utils.formatTime(startTime)}`
+                    + (cutStart < startTime ? ` (кліп з ключового кадру ${utils.formatTime(cutStart)})` : '')
             });
             marker.dataset.project = project;
-            marker.style.left = `${(startTime / this.elements.videoPlayer.duration) * 100}%`;
+            marker.style.left = `${(cutStart / this.elements.videoPlayer.duration) * 100}%`;
             this.elements.timeline.appendChild(marker);
 
             this.state.unfinishedFragments[project] = {
@@ -508,6 +636,10 @@ class VideoEditor {
             };
         }
         this._updateUnfinishedFragmentsUI();
+
+        if (startTime - cutStart >= 1) {
+            notify(`Кліп почнеться з ключового кадру ${utils.formatTime(cutStart)} - на ${(startTime - cutStart).toFixed(1)} с раніше мітки`, 'info');
+        }
     }
 
     _showProjectModal(projects, callback) {
@@ -779,6 +911,7 @@ class VideoEditor {
                 notify('Анотацію завершено! Відео відправлено на обробку', 'success');
                 
                 // Розблоковуємо відео
+                this._stopLockHeartbeat();
                 await api.post(`/video/${this.state.currentVideoId}/unlock`);
                 
                 // Повертаємось до списку відео
@@ -794,6 +927,46 @@ class VideoEditor {
         }
     }
 
+    _updateLockInfo(expiresAtIso) {
+        if (expiresAtIso) {
+            const expiresAt = new Date(expiresAtIso);
+            this.elements.lockExpiresTime.textContent = expiresAt.toLocaleTimeString();
+            this.elements.videoLockInfo.style.display = 'flex';
+        } else {
+            this.elements.videoLockInfo.style.display = 'none';
+        }
+    }
+
+    _startLockHeartbeat(leaseSeconds) {
+        this._stopLockHeartbeat();
+        if (!leaseSeconds) return;
+
+        // Продовжуємо оренду тричі за її тривалість, щоб пережити один пропущений запит
+        const intervalMs = Math.max(leaseSeconds / 3, 15) * 1000;
+
+        this.state.lockHeartbeatTimer = setInterval(async () => {
+            try {
+                const result = await api.post(`/video/${this.state.currentVideoId}/heartbeat`);
+                if (result?.success) {
+                    this._updateLockInfo(result.expires_at);
+                    return;
+                }
+                throw new Error(result?.message || 'Блокування відео втрачено');
+            } catch (error) {
+                console.error('Lock heartbeat failed:', error);
+                this._stopLockHeartbeat();
+                notify('Блокування відео втрачено. Збережіть роботу та відкрийте відео повторно', 'error');
+            }
+        }, intervalMs);
+    }
+
+    _stopLockHeartbeat() {
+        if (this.state.lockHeartbeatTimer) {
+            clearInterval(this.state.lockHeartbeatTimer);
+            this.state.lockHeartbeatTimer = null;
+        }
+    }
+
     _collectMetadata() {
         const form = this.elements.metadataForm;
         return {
@@ -825,6 +998,7 @@ class VideoEditor {
 
     destroy() {
         this._removeVideoEventListeners();
+        this._stopLockHeartbeat();
         if (this.state.currentVideoId) {
             api.post(`/video/${this.state.currentVideoId}/unlock`).catch(console.error);
         }
@@ -7,7 +7,9 @@ class VideoUploader {
             result: document.getElementById('result')
         };
         this.activeUploads = new Map();
-        this.progressIntervals = new Map();
+        this.trackedTasks = new Map();
+        this.progressSource = null;
+        this.progressReconnectTimer = null;
         this._init();
     }
 
@@ -383,27 +385,62 @@ class VideoUploader {
     }
 
     _startProgressTracking(uploadId) {
-        const interval = setInterval(() => this._checkTaskProgress(uploadId), 5000);
-        this.progressIntervals.set(uploadId, interval);
+        const uploadData = this.activeUploads.get(uploadId);
+        if (!uploadData?.taskId) return;
+
+        this.trackedTasks.set(uploadData.taskId, uploadId);
+        this._scheduleProgressStreamReconnect(0);
     }
 
-    async _checkTaskProgress(uploadId) {
-        const uploadData = this.activeUploads.get(uploadId);
-        if (!uploadData) return this._clearProgressInterval(uploadId);
+    _scheduleProgressStreamReconnect(delay) {
+        // Кілька завантажень за раз - одна підписка на весь набір
+        clearTimeout(this.progressReconnectTimer);
+        this.progressReconnectTimer = setTimeout(() => this._reconnectProgressStream(), delay);
+    }
 
-        try {
-            const data = await api.get(`/video/task/${uploadData.taskId}/status`);
-            if (!data) return this.removeUpload(uploadId);
+    async _reconnectProgressStream() {
+        this._closeProgressStream();
+        if (this.trackedTasks.size === 0) return;
 
-            this._updateProgressDisplay(uploadId, data);
+        try {
+            if (auth.token && auth.isTokenExpired(auth.token) && !(await auth.refresh())) return;
 
-            if (['completed', 'failed'].includes(data.status)) {
-                this._clearProgressInterval(uploadId);
-                data.status === 'completed' ? this._showCompletedState(uploadId, uploadData) : this._showErrorState(uploadId, data.message);
-            }
+            const data = await api.post('/video/task/progress/subscriptions', {
+                task_ids: Array.from(this.trackedTasks.keys())
+            });
+            if (!data?.subscription_id || this.trackedTasks.size === 0) return;
+
+            const params = new URLSearchParams({ subscription_id: data.subscription_id, token: auth.token });
+            this.progressSource = new EventSource(`/video/task/progress/stream?${params}`);
+            this.progressSource.onmessage = event => this._handleProgressEvent(JSON.parse(event.data));
+            this.progressSource.onerror = () => {
+                // Потік закривається сервером після завершення всіх завдань або при збої мережі
+                this._closeProgressStream();
+                this._scheduleProgressStreamReconnect(5000);
+            };
         } catch (error) {
-            console.error('Помилка перевірки прогресу:', error);
-            this.removeUpload(uploadId);
+            console.error('Помилка підписки на прогрес:', error);
+            this._scheduleProgressStreamReconnect(5000);
+        }
+    }
+
+    _closeProgressStream() {
+        if (this.progressSource) {
+            this.progressSource.close();
+            this.progressSource = null;
+        }
+    }
+
+    _handleProgressEvent(data) {
+        const uploadId = this.trackedTasks.get(data.task_id);
+        const uploadData = uploadId && this.activeUploads.get(uploadId);
+        if (!uploadData) return;
+
+        this._updateProgressDisplay(uploadId, data);
+
+        if (['completed', 'failed'].includes(data.status)) {
+            this._stopProgressTracking(uploadId);
+            data.status === 'completed' ? this._showCompletedState(uploadId, uploadData) : this._showErrorState(uploadId, data.message);
         }
     }
 
@@ -477,7 +514,7 @@ class VideoUploader {
     }
 
     removeUpload(uploadId) {
-        this._clearProgressInterval(uploadId);
+        this._stopProgressTracking(uploadId);
         this.activeUploads.delete(uploadId);
         this._saveUploadsToStorage();
 
@@ -488,11 +525,14 @@ class VideoUploader {
         }
     }
 
-    _clearProgressInterval(uploadId) {
-        const interval = this.progressIntervals.get(uploadId);
-        if (interval) {
-            clearInterval(interval);
-            this.progressIntervals.delete(uploadId);
+    _stopProgressTracking(uploadId) {
+        for (const [taskId, trackedUploadId] of this.trackedTasks) {
+            if (trackedUploadId === uploadId) this.trackedTasks.delete(taskId);
+        }
+
+        if (this.trackedTasks.size === 0) {
+            clearTimeout(this.progressReconnectTimer);
+            this._closeProgressStream();
         }
     }
 
@@ -0,0 +1,96 @@
+# tech_scripts/benchmark_video_list.py
+"""
+Вимірює затримку /video/list під час паралельних запитів /video/upload.
+
+Приклад:
+    python tech_scripts/benchmark_video_list.py --base-url http://localhost:8000 \
+        --email admin@example.com --password secret \
+        --upload-url https://account.blob.core.windows.net/container/input/video.mp4
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    """Отримує access токен"""
+    response = requests.post(f"{base_url}/auth/login", json={"email": email, "password": password}, timeout=30)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def upload_worker(base_url: str, token: str, upload_url: str, stop: threading.Event) -> int:
+    """Безперервно надсилає запити на реєстрацію відео"""
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    sent = 0
+    while not stop.is_set():
+        session.post(f"{base_url}/video/upload", json={"video_urls": [upload_url]}, timeout=120)
+        sent += 1
+    return sent
+
+
+def list_worker(base_url: str, token: str, stop: threading.Event) -> list[float]:
+    """Вимірює затримку запитів списку відео в мілісекундах"""
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        session.get(f"{base_url}/video/list?page=1&per_page=20", timeout=120)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Перцентиль без сторонніх залежностей"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /video/list під навантаженням завантажень")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--upload-url", help="Azure URL для паралельних /video/upload (без нього - лише список)")
+    parser.add_argument("--uploaders", type=int, default=8)
+    parser.add_argument("--listers", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=30, help="Тривалість у секундах")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.email, args.password)
+    stop = threading.Event()
+    uploaders = args.uploaders if args.upload_url else 0
+
+    with ThreadPoolExecutor(max_workers=uploaders + args.listers) as executor:
+        upload_futures = [
+            executor.submit(upload_worker, args.base_url, token, args.upload_url, stop)
+            for _ in range(uploaders)
+        ]
+        list_futures = [executor.submit(list_worker, args.base_url, token, stop) for _ in range(args.listers)]
+
+        time.sleep(args.duration)
+        stop.set()
+
+        latencies = [latency for future in list_futures for latency in future.result()]
+        uploads = sum(future.result() for future in upload_futures)
+
+    if not latencies:
+        print("Немає вимірювань")
+        return
+
+    print(f"Запитів /video/list: {len(latencies)}, запитів /video/upload: {uploads}")
+    print(f"p50: {statistics.median(latencies):.1f} ms")
+    print(f"p95: {percentile(latencies, 95):.1f} ms")
+    print(f"p99: {percentile(latencies, 99):.1f} ms")
+    print(f"max: {max(latencies):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
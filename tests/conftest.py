@@ -0,0 +1,4 @@
+import os
+
+# Settings вимагають SECRET_KEY; тести не використовують .env
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
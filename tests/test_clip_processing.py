@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from backend.background_tasks.tasks import clip_processing as clip_tasks
+from backend.services import clip_processing_service as clip_service_module
+from backend.services.clip_processing_service import ClipProcessingService
+
+SOURCE_VIDEO_ID = "source-1"
+
+
+class StubRepository:
+    """In-memory stand-in for BaseDocumentRepository keyed by document id"""
+
+    def __init__(self, documents: List[Any]):
+        self.documents = {str(document.id): document for document in documents}
+
+    def get_by_id(self, doc_id: str) -> Any:
+        return self.documents.get(doc_id)
+
+    def get_all(self, filter_dict: Dict[str, Any] = None) -> List[Any]:
+        filter_dict = filter_dict or {}
+        return [
+            document for document in self.documents.values()
+            if all(getattr(document, key) == value for key, value in filter_dict.items())
+        ]
+
+    def update_by_id(self, doc_id: str, update_data: Dict[str, Any]) -> bool:
+        for key, value in update_data.items():
+            setattr(self.documents[doc_id], key, value)
+        return True
+
+
+def make_clip(clip_id: str, status: str = "not_annotated") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=clip_id, source_video_id=SOURCE_VIDEO_ID, extension="mp4",
+        status=status, cvat_task_id=None, start_time_offset_sec=0, duration_sec=10
+    )
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(clip_service_module.settings, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(clip_tasks.DatabaseConnection, "is_connected", lambda: True)
+
+    clip_service = ClipProcessingService.__new__(ClipProcessingService)
+    clip_service.clip_repo = StubRepository([make_clip("clip-1"), make_clip("clip-2")])
+    clip_service.source_repo = StubRepository([SimpleNamespace(id=SOURCE_VIDEO_ID, status="processing_clips")])
+    monkeypatch.setattr(clip_tasks, "ClipProcessingService", lambda: clip_service)
+    return clip_service
+
+
+def test_failed_clip_stops_chain_and_marks_source_failed(service, tmp_path):
+    def broken_source_lookup(doc_id: str) -> Any:
+        raise RuntimeError("database is gone")
+
+    service.source_repo.get_by_id = broken_source_lookup
+    prepared_path = tmp_path / "prepared_clip_clip-2.mp4"
+    prepared_path.write_bytes(b"clip")
+
+    # Помилка кліпу має зупинити ланцюжок, а не повернутись словником
+    with pytest.raises(RuntimeError):
+        clip_tasks.process_video_clip("clip-1")
+    assert service.clip_repo.documents["clip-1"].status == "processing_failed"
+
+    # Errback chord-а, який Celery викликає для зупиненого ланцюжка
+    clip_tasks.fail_video_processing(None, RuntimeError("database is gone"), None, SOURCE_VIDEO_ID)
+
+    assert service.source_repo.documents[SOURCE_VIDEO_ID].status == "annotation_error"
+    assert not prepared_path.exists()
+
+
+def test_finalize_marks_source_failed_when_a_clip_failed(service):
+    service.clip_repo.documents["clip-2"].status = "azure_upload_failed"
+    service.clip_repo.documents["clip-1"].cvat_task_id = 7
+
+    result = service.finalize_clips_processing(SOURCE_VIDEO_ID)
+
+    assert result["failed_clips"] == 1
+    assert service.source_repo.documents[SOURCE_VIDEO_ID].status == "annotation_error"
+
+
+def test_plan_clip_lanes_keeps_batch_groups_in_one_lane(service, monkeypatch):
+    monkeypatch.setattr(clip_service_module.settings, "clip_batch_max_gap_sec", 5)
+    clips = [make_clip(f"clip-{i}") for i in range(4)]
+    for clip, start in zip(clips, [0, 12, 500, 1000]):
+        clip.start_time_offset_sec = start
+
+    lanes = service.plan_clip_lanes(clips, 3)
+
+    assert [[[clip.id for clip in clip_group] for clip_group in lane] for lane in lanes] == [
+        [["clip-0", "clip-1"]],
+        [["clip-2"]],
+        [["clip-3"]],
+    ]
@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from backend.services.cvat_service import CVATService
+from backend.utils import cvat_client as cvat_client_module
+from backend.utils.cvat_client import CVATClient, CVATClientError
+
+BASE_URL = "http://cvat.local:8080"
+
+
+class StubRequest:
+    def __init__(self, method: str):
+        self.method = method
+
+
+class StubResponse:
+    def __init__(self, method: str, url: str, status_code: int,
+                 headers: Optional[Dict[str, str]] = None, body: Any = None):
+        self.request = StubRequest(method)
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+        self.text = str(body or "")
+
+    def json(self) -> Any:
+        return self._body
+
+
+class StubSession:
+    """Records requests and answers them from a queue of (status, headers, body)"""
+
+    def __init__(self, responses: List[tuple]):
+        self.responses = list(responses)
+        self.calls: List[Dict[str, Any]] = []
+        self.headers: Dict[str, str] = {}
+
+    def request(self, method: str, url: str, **kwargs) -> StubResponse:
+        self.calls.append({"method": method, "url": url, **kwargs})
+        status_code, headers, body = self.responses.pop(0)
+        return StubResponse(method, url, status_code, headers, body)
+
+
+def make_client(responses: List[tuple], upload_chunk_size: int = 4) -> CVATClient:
+    client = CVATClient(BASE_URL, "user", "password", upload_chunk_size=upload_chunk_size)
+    client.session = StubSession(responses)
+    client._token = "token"
+    return client
+
+
+def test_upload_task_data_sends_file_in_tus_chunks(tmp_path):
+    file_path = tmp_path / "clip.mp4"
+    file_path.write_bytes(b"0123456789")
+
+    client = make_client([
+        (202, {}, None),
+        (201, {"Location": "/api/tasks/7/data/upload-id"}, None),
+        (204, {"Upload-Offset": "4"}, None),
+        (204, {"Upload-Offset": "8"}, None),
+        (204, {"Upload-Offset": "10"}, None),
+        (202, {}, None),
+    ])
+
+    client.upload_task_data(7, str(file_path), {"image_quality": 100})
+
+    calls = client.session.calls
+    assert calls[0]["headers"] == {"Upload-Start": ""}
+    assert calls[1]["headers"]["Upload-Length"] == "10"
+    assert calls[1]["headers"]["Tus-Resumable"] == "1.0.0"
+
+    patches = [call for call in calls if call["method"] == "PATCH"]
+    assert [call["url"] for call in patches] == [f"{BASE_URL}/api/tasks/7/data/upload-id"] * 3
+    assert [call["headers"]["Upload-Offset"] for call in patches] == ["0", "4", "8"]
+    assert b"".join(call["data"] for call in patches) == b"0123456789"
+
+    assert calls[-1]["headers"] == {"Upload-Finish": ""}
+    assert calls[-1]["json"] == {"image_quality": 100}
+
+
+def test_upload_task_data_fails_without_tus_location(tmp_path):
+    file_path = tmp_path / "clip.mp4"
+    file_path.write_bytes(b"0123456789")
+
+    client = make_client([
+        (202, {}, None),
+        (201, {}, None),
+    ])
+
+    with pytest.raises(CVATClientError):
+        client.upload_task_data(7, str(file_path), {})
+
+
+def test_wait_for_task_backs_off_until_final_state(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(cvat_client_module.time, "sleep", sleeps.append)
+
+    client = make_client([
+        (200, {}, {"state": "Queued"}),
+        (200, {}, {"state": "Started"}),
+        (200, {}, {"state": "Started"}),
+        (200, {}, {"state": "Finished"}),
+    ])
+
+    status = client.wait_for_task(7, timeout=60)
+
+    assert status["state"] == "Finished"
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+class StubCVATClient:
+    def __init__(self, upload_error: Optional[Exception] = None, final_state: str = "Finished"):
+        self.upload_error = upload_error
+        self.final_state = final_state
+        self.deleted_tasks: List[int] = []
+
+    def create_task(self, name: str, project_id: int, overlap: int, segment_size: int) -> int:
+        return 7
+
+    def upload_task_data(self, task_id: int, file_path: str, data_params: Dict[str, Any]) -> None:
+        if self.upload_error:
+            raise self.upload_error
+
+    def wait_for_task(self, task_id: int, timeout: int) -> Dict[str, Any]:
+        return {"state": self.final_state, "message": ""}
+
+    def delete_task(self, task_id: int) -> None:
+        self.deleted_tasks.append(task_id)
+
+
+def make_service(client: StubCVATClient) -> CVATService:
+    service = CVATService.__new__(CVATService)
+    service.client = client
+    return service
+
+
+PROJECT_PARAMS = {"project_id": 5, "overlap": 5, "segment_size": 400, "image_quality": 100}
+
+
+def test_create_task_returns_task_id_on_success():
+    client = StubCVATClient()
+
+    assert make_service(client).create_task("clip.mp4", "/tmp/clip.mp4", PROJECT_PARAMS) == "7"
+    assert client.deleted_tasks == []
+
+
+def test_create_task_deletes_task_when_upload_fails():
+    client = StubCVATClient(upload_error=CVATClientError("upload failed"))
+
+    assert make_service(client).create_task("clip.mp4", "/tmp/clip.mp4", PROJECT_PARAMS) is None
+    assert client.deleted_tasks == [7]
+
+
+def test_create_task_deletes_task_when_data_processing_fails():
+    client = StubCVATClient(final_state="Failed")
+
+    assert make_service(client).create_task("clip.mp4", "/tmp/clip.mp4", PROJECT_PARAMS) is None
+    assert client.deleted_tasks == [7]
@@ -0,0 +1,27 @@
+import time
+
+from backend.utils import signed_urls
+from backend.utils.signed_urls import get_signed_url_expiry, sign_resource, verify_resource_signature
+
+
+def test_expiry_is_shared_within_a_window(monkeypatch):
+    monkeypatch.setattr(signed_urls.time, "time", lambda: 7200 + 10)
+    first = get_signed_url_expiry(3600)
+    monkeypatch.setattr(signed_urls.time, "time", lambda: 7200 + 3500)
+
+    assert get_signed_url_expiry(3600) == first == 14400
+
+
+def test_signature_is_bound_to_resource_and_expiry():
+    expires = int(time.time()) + 600
+    signature = sign_resource("hls:video-1", expires)
+
+    assert verify_resource_signature("hls:video-1", expires, signature)
+    assert not verify_resource_signature("hls:video-2", expires, signature)
+    assert not verify_resource_signature("hls:video-1", expires + 1, signature)
+
+
+def test_expired_signature_is_rejected():
+    expires = int(time.time()) - 1
+
+    assert not verify_resource_signature("hls:video-1", expires, sign_resource("hls:video-1", expires))